@@ -0,0 +1,36 @@
+"""add_cache_entries
+
+Revision ID: 0a7e5c3b9d16
+Revises: f4b9d2c6a871
+Create Date: 2026-10-18 17:20:13.882461
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7e5c3b9d16'
+down_revision: Union[str, Sequence[str], None] = 'f4b9d2c6a871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # UNLOGGED: no WAL writes; the cache is truncated after a crash, which is fine.
+    op.execute(
+        "CREATE UNLOGGED TABLE cache_entries ("
+        "key TEXT PRIMARY KEY, "
+        "value BYTEA NOT NULL, "
+        "expires_at TIMESTAMPTZ"
+        ")"
+    )
+    op.create_index('ix_cache_entries_expires_at', 'cache_entries', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cache_entries_expires_at', table_name='cache_entries')
+    op.drop_table('cache_entries')
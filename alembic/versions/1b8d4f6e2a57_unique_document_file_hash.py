@@ -0,0 +1,51 @@
+"""unique_document_file_hash
+
+Revision ID: 1b8d4f6e2a57
+Revises: 0a7e5c3b9d16
+Create Date: 2026-10-18 18:02:41.517390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b8d4f6e2a57'
+down_revision: Union[str, Sequence[str], None] = '0a7e5c3b9d16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Collapse duplicate uploads onto one row per file_hash, preferring the
+    # one that is already ingested, then the oldest.
+    op.execute(
+        "CREATE TEMP TABLE document_duplicates ON COMMIT DROP AS "
+        "SELECT id, keep_id FROM ("
+        "SELECT id, first_value(id) OVER ("
+        "PARTITION BY file_hash "
+        "ORDER BY (status = 'ready') DESC, created_at, id"
+        ") AS keep_id FROM documents"
+        ") ranked WHERE id <> keep_id"
+    )
+    op.execute(
+        "UPDATE chat_sessions SET document_id = d.keep_id "
+        "FROM document_duplicates d WHERE chat_sessions.document_id = d.id"
+    )
+    op.execute(
+        "UPDATE chat_history SET document_id = d.keep_id "
+        "FROM document_duplicates d WHERE chat_history.document_id = d.id"
+    )
+    op.execute(
+        "DELETE FROM documents USING document_duplicates d WHERE documents.id = d.id"
+    )
+    op.drop_index('ix_documents_file_hash', table_name='documents')
+    op.create_index('ix_documents_file_hash', 'documents', ['file_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_file_hash', table_name='documents')
+    op.create_index('ix_documents_file_hash', 'documents', ['file_hash'], unique=False)
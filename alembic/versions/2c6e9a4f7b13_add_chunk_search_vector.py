@@ -0,0 +1,37 @@
+"""add_chunk_search_vector
+
+Revision ID: 2c6e9a4f7b13
+Revises: 1b8d4f6e2a57
+Create Date: 2026-10-18 18:41:07.263854
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c6e9a4f7b13'
+down_revision: Union[str, Sequence[str], None] = '1b8d4f6e2a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Generated column: existing rows are backfilled by the ALTER itself.
+    op.add_column('document_chunks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', text)", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_document_chunks_search_vector', 'document_chunks', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_chunks_search_vector', table_name='document_chunks', postgresql_using='gin')
+    op.drop_column('document_chunks', 'search_vector')
@@ -0,0 +1,32 @@
+"""add_document_content
+
+Revision ID: 3c1f9a7d2e10
+Revises: 606f8c745884
+Create Date: 2026-10-18 09:12:41.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d2e10'
+down_revision: Union[str, Sequence[str], None] = '606f8c745884'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('content', sa.Text(), nullable=True))
+    op.add_column('documents', sa.Column('content_hash', sa.String(), nullable=True))
+    op.create_index(op.f('ix_documents_content_hash'), 'documents', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_content_hash'), table_name='documents')
+    op.drop_column('documents', 'content_hash')
+    op.drop_column('documents', 'content')
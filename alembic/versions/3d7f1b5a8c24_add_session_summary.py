@@ -0,0 +1,32 @@
+"""add_session_summary
+
+Revision ID: 3d7f1b5a8c24
+Revises: 2c6e9a4f7b13
+Create Date: 2026-10-18 19:12:36.408125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7f1b5a8c24'
+down_revision: Union[str, Sequence[str], None] = '2c6e9a4f7b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chat_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_until', sa.DateTime(), nullable=True))
+    op.create_index('ix_chat_history_session_id_created_at', 'chat_history', ['session_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_history_session_id_created_at', table_name='chat_history')
+    op.drop_column('chat_sessions', 'summary_until')
+    op.drop_column('chat_sessions', 'summary')
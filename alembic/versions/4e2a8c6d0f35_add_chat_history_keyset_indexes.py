@@ -0,0 +1,32 @@
+"""add_chat_history_keyset_indexes
+
+Revision ID: 4e2a8c6d0f35
+Revises: 3d7f1b5a8c24
+Create Date: 2026-10-18 20:05:52.719364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e2a8c6d0f35'
+down_revision: Union[str, Sequence[str], None] = '3d7f1b5a8c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_chat_history_session_id_created_at_id', 'chat_history', ['session_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_chat_history_created_at_id', 'chat_history', ['created_at', 'id'], unique=False)
+    # Superseded by the (session_id, created_at, id) index.
+    op.drop_index('ix_chat_history_session_id_created_at', table_name='chat_history')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_chat_history_session_id_created_at', 'chat_history', ['session_id', 'created_at'], unique=False)
+    op.drop_index('ix_chat_history_created_at_id', table_name='chat_history')
+    op.drop_index('ix_chat_history_session_id_created_at_id', table_name='chat_history')
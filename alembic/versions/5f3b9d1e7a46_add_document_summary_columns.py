@@ -0,0 +1,48 @@
+"""add_document_summary_columns
+
+Revision ID: 5f3b9d1e7a46
+Revises: 4e2a8c6d0f35
+Create Date: 2026-10-18 21:12:40.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3b9d1e7a46'
+down_revision: Union[str, Sequence[str], None] = '4e2a8c6d0f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('page_count', sa.Integer(), nullable=True))
+    op.add_column('documents', sa.Column('chunk_count', sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE documents
+        SET page_count = jsonb_array_length(page_offsets)
+        WHERE jsonb_typeof(page_offsets) = 'array'
+        """
+    )
+    op.execute(
+        """
+        UPDATE documents
+        SET chunk_count = jsonb_array_length(chunks)
+        WHERE jsonb_typeof(chunks) = 'array'
+        """
+    )
+    op.create_index('ix_documents_created_at_id', 'documents', ['created_at', 'id'], unique=False)
+    op.create_index('ix_chat_sessions_created_at_id', 'chat_sessions', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_sessions_created_at_id', table_name='chat_sessions')
+    op.drop_index('ix_documents_created_at_id', table_name='documents')
+    op.drop_column('documents', 'chunk_count')
+    op.drop_column('documents', 'page_count')
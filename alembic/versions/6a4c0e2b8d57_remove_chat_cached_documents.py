@@ -0,0 +1,57 @@
+"""remove_chat_cached_documents
+
+Revision ID: 6a4c0e2b8d57
+Revises: 5f3b9d1e7a46
+Create Date: 2026-10-18 23:41:06.582913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a4c0e2b8d57'
+down_revision: Union[str, Sequence[str], None] = '5f3b9d1e7a46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Before documents were resolved by id, chat cached each document's
+    # chunks and embeddings in a second row with no file_path, keyed by the
+    # md5 of its text. Map each of those onto the upload it came from.
+    op.execute(
+        "CREATE TEMP TABLE chat_cached_documents ON COMMIT DROP AS "
+        "SELECT cached.id, ("
+        "SELECT uploaded.id FROM documents uploaded "
+        "WHERE uploaded.file_path IS NOT NULL "
+        "AND (uploaded.content_hash = cached.file_hash "
+        "OR md5(uploaded.content) = cached.file_hash) "
+        "ORDER BY uploaded.created_at, uploaded.id LIMIT 1"
+        ") AS keep_id "
+        "FROM documents cached WHERE cached.file_path IS NULL"
+    )
+    op.execute(
+        "UPDATE chat_sessions SET document_id = d.keep_id "
+        "FROM chat_cached_documents d "
+        "WHERE chat_sessions.document_id = d.id AND d.keep_id IS NOT NULL"
+    )
+    # chat_history.document_id cascades on delete; keep the turns.
+    op.execute(
+        "UPDATE chat_history SET document_id = d.keep_id "
+        "FROM chat_cached_documents d WHERE chat_history.document_id = d.id"
+    )
+    # Rows a session still points at (no matching upload) are kept.
+    op.execute(
+        "DELETE FROM documents USING chat_cached_documents d "
+        "WHERE documents.id = d.id AND NOT EXISTS ("
+        "SELECT 1 FROM chat_sessions s WHERE s.document_id = d.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The removed rows were derived data; nothing to restore.
+    pass
@@ -0,0 +1,28 @@
+"""add_document_ingestion_started_at
+
+Revision ID: 7c5e1a3f9b68
+Revises: 6a4c0e2b8d57
+Create Date: 2026-10-19 00:27:13.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c5e1a3f9b68'
+down_revision: Union[str, Sequence[str], None] = '6a4c0e2b8d57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('ingestion_started_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'ingestion_started_at')
@@ -0,0 +1,85 @@
+"""pack_document_embeddings
+
+Revision ID: 8e4b2d6c1a93
+Revises: 3c1f9a7d2e10
+Create Date: 2026-10-18 10:03:17.558902
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b2d6c1a93'
+down_revision: Union[str, Sequence[str], None] = '3c1f9a7d2e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('embeddings_packed', sa.LargeBinary(), nullable=True))
+    op.add_column('documents', sa.Column('embedding_dim', sa.Integer(), nullable=True))
+    op.add_column('documents', sa.Column('embedding_dtype', sa.String(), nullable=True))
+
+    # Convert row by row so large documents are never all held in memory at once.
+    bind = op.get_bind()
+    ids = bind.execute(
+        sa.text("SELECT id FROM documents WHERE embeddings IS NOT NULL")
+    ).scalars().all()
+    for doc_id in ids:
+        embeddings = bind.execute(
+            sa.text("SELECT embeddings FROM documents WHERE id = :id"),
+            {"id": doc_id},
+        ).scalar_one()
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.size == 0:
+            continue
+        bind.execute(
+            sa.text(
+                "UPDATE documents SET embeddings_packed = :packed, "
+                "embedding_dim = :dim, embedding_dtype = 'float32' WHERE id = :id"
+            ),
+            {"packed": matrix.tobytes(), "dim": matrix.shape[1], "id": doc_id},
+        )
+
+    op.drop_column('documents', 'embeddings')
+    op.alter_column('documents', 'embeddings_packed', new_column_name='embeddings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('documents', 'embeddings', new_column_name='embeddings_packed')
+    op.add_column('documents', sa.Column('embeddings', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            "SELECT id, embedding_dim, embedding_dtype FROM documents "
+            "WHERE embeddings_packed IS NOT NULL"
+        )
+    ).all()
+    for doc_id, dim, dtype in rows:
+        packed = bind.execute(
+            sa.text("SELECT embeddings_packed FROM documents WHERE id = :id"),
+            {"id": doc_id},
+        ).scalar_one()
+        if dtype == "int8":
+            n_rows = len(packed) // (4 + dim)
+            scales = np.frombuffer(packed, dtype=np.float32, count=n_rows)
+            matrix = np.frombuffer(packed, dtype=np.int8, offset=4 * n_rows).reshape(n_rows, dim) * scales[:, None]
+        else:
+            matrix = np.frombuffer(packed, dtype=dtype).reshape(-1, dim)
+        bind.execute(
+            sa.text("UPDATE documents SET embeddings = CAST(:embeddings AS JSONB) WHERE id = :id"),
+            {"embeddings": json.dumps(matrix.astype(float).tolist()), "id": doc_id},
+        )
+
+    op.drop_column('documents', 'embedding_dtype')
+    op.drop_column('documents', 'embedding_dim')
+    op.drop_column('documents', 'embeddings_packed')
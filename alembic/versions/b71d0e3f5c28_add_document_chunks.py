@@ -0,0 +1,95 @@
+"""add_document_chunks
+
+Revision ID: b71d0e3f5c28
+Revises: 8e4b2d6c1a93
+Create Date: 2026-10-18 11:26:05.914370
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d0e3f5c28'
+down_revision: Union[str, Sequence[str], None] = '8e4b2d6c1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIM = 1536
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table('document_chunks',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=False),
+    sa.Column('ordinal', sa.Integer(), nullable=False),
+    sa.Column('page_number', sa.Integer(), nullable=True),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('embedding', Vector(EMBEDDING_DIM), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_id', 'ordinal')
+    )
+    op.create_index(op.f('ix_document_chunks_document_id'), 'document_chunks', ['document_id'], unique=False)
+
+    # Backfill from the packed embeddings already cached on documents.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            "SELECT id, embedding_dim, embedding_dtype FROM documents "
+            "WHERE embeddings IS NOT NULL AND embedding_dim = :dim"
+        ),
+        {"dim": EMBEDDING_DIM},
+    ).all()
+    for doc_id, dim, dtype in rows:
+        chunks, packed = bind.execute(
+            sa.text("SELECT chunks, embeddings FROM documents WHERE id = :id"),
+            {"id": doc_id},
+        ).one()
+        if dtype == "int8":
+            n_rows = len(packed) // (4 + dim)
+            scales = np.frombuffer(packed, dtype=np.float32, count=n_rows)
+            matrix = np.frombuffer(packed, dtype=np.int8, offset=4 * n_rows).reshape(n_rows, dim) * scales[:, None]
+        else:
+            matrix = np.frombuffer(packed, dtype=dtype).reshape(-1, dim)
+        if not chunks:
+            continue
+        bind.execute(
+            sa.text(
+                "INSERT INTO document_chunks (id, document_id, ordinal, text, embedding) "
+                "VALUES (gen_random_uuid(), :document_id, :ordinal, :text, CAST(:embedding AS vector))"
+            ),
+            [
+                {
+                    "document_id": doc_id,
+                    "ordinal": ordinal,
+                    "text": chunk,
+                    "embedding": "[" + ",".join(map(str, vector.tolist())) + "]",
+                }
+                for ordinal, (chunk, vector) in enumerate(zip(chunks, matrix))
+            ],
+        )
+
+    # Build the ANN index after the bulk load; it is much cheaper than maintaining it per row.
+    op.create_index(
+        'ix_document_chunks_embedding_hnsw',
+        'document_chunks',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_chunks_embedding_hnsw', table_name='document_chunks')
+    op.drop_index(op.f('ix_document_chunks_document_id'), table_name='document_chunks')
+    op.drop_table('document_chunks')
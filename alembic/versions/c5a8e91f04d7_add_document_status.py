@@ -0,0 +1,34 @@
+"""add_document_status
+
+Revision ID: c5a8e91f04d7
+Revises: b71d0e3f5c28
+Create Date: 2026-10-18 12:41:52.377120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a8e91f04d7'
+down_revision: Union[str, Sequence[str], None] = 'b71d0e3f5c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('status', sa.String(), server_default='pending', nullable=False))
+    op.add_column('documents', sa.Column('error', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_documents_status'), 'documents', ['status'], unique=False)
+    # Already embedded documents are ready; everything else is picked up by the worker on start.
+    op.execute("UPDATE documents SET status = 'ready' WHERE embeddings IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_status'), table_name='documents')
+    op.drop_column('documents', 'error')
+    op.drop_column('documents', 'status')
@@ -0,0 +1,29 @@
+"""add_document_page_offsets
+
+Revision ID: d2f6b8a3e915
+Revises: c5a8e91f04d7
+Create Date: 2026-10-18 13:35:28.640213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b8a3e915'
+down_revision: Union[str, Sequence[str], None] = 'c5a8e91f04d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('page_offsets', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'page_offsets')
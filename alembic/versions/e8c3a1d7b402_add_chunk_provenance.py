@@ -0,0 +1,33 @@
+"""add_chunk_provenance
+
+Revision ID: e8c3a1d7b402
+Revises: d2f6b8a3e915
+Create Date: 2026-10-18 14:52:09.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3a1d7b402'
+down_revision: Union[str, Sequence[str], None] = 'd2f6b8a3e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('chunk_spans', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('document_chunks', sa.Column('start_char', sa.Integer(), nullable=True))
+    op.add_column('document_chunks', sa.Column('end_char', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('document_chunks', 'end_char')
+    op.drop_column('document_chunks', 'start_char')
+    op.drop_column('documents', 'chunk_spans')
@@ -0,0 +1,43 @@
+"""add_answer_cache_columns
+
+Revision ID: f4b9d2c6a871
+Revises: e8c3a1d7b402
+Create Date: 2026-10-18 16:08:44.203519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b9d2c6a871'
+down_revision: Union[str, Sequence[str], None] = 'e8c3a1d7b402'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chat_history', sa.Column('document_id', sa.UUID(), nullable=True))
+    op.add_column('chat_history', sa.Column('sources_hash', sa.String(), nullable=True))
+    op.add_column('chat_history', sa.Column('question_embedding', sa.LargeBinary(), nullable=True))
+    op.create_foreign_key(
+        'chat_history_document_id_fkey', 'chat_history', 'documents',
+        ['document_id'], ['id'], ondelete='CASCADE',
+    )
+    op.execute(
+        "UPDATE chat_history SET document_id = chat_sessions.document_id "
+        "FROM chat_sessions WHERE chat_sessions.id = chat_history.session_id"
+    )
+    op.create_index('ix_chat_history_document_id_sources_hash', 'chat_history', ['document_id', 'sources_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_history_document_id_sources_hash', table_name='chat_history')
+    op.drop_constraint('chat_history_document_id_fkey', 'chat_history', type_='foreignkey')
+    op.drop_column('chat_history', 'question_embedding')
+    op.drop_column('chat_history', 'sources_hash')
+    op.drop_column('chat_history', 'document_id')
@@ -1,25 +1,20 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, Form
+from fastapi import APIRouter, Depends, Form, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional, Union
 from app.db.database import get_db
-from app.schemas.chat import ChatRead
+from app.schemas.chat import ChatRead, ChatSummaryRead, ChatView
+from app.schemas.search import SearchHit, SearchRequest
 from app.services.chat.ask import ChatQuestionService
-from app.services.llm.openai import OpenAIService
-from app.services.chat.chunks import ChunkService
+from app.services.llm.service import get_llm_service
+from app.services.pagination import NEXT_CURSOR_HEADER
 from app.services.rag import RAGService
-from app.core.config import settings
-import asyncio
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
 
 router = APIRouter()
 
 
 def get_chat_service():
-    ai = OpenAIService(api_key=settings.OPENAI_API_KEY)
-    chunks = ChunkService()
-    return ChatQuestionService(ai_service=ai, chunk_service=chunks)
+    return ChatQuestionService(ai_service=get_llm_service())
 
 
 @router.post("/chat")
@@ -33,11 +28,50 @@ async def chat_endpoint(
     return await service.process_and_ask(file_id, session_id, question, db)
 
 
-@router.get("/history", response_model=List[ChatRead])
-async def get_chats(db: AsyncSession = Depends(get_db)):
-    return await RAGService.get_all_chats(db=db)
+@router.post("/search", response_model=List[SearchHit])
+async def search_endpoint(
+    request: SearchRequest,
+    db: AsyncSession = Depends(get_db),
+    service: ChatQuestionService = Depends(get_chat_service)
+):
+    return await service.search(
+        request.question,
+        db,
+        document_ids=request.document_ids,
+        top_k=request.top_k,
+    )
 
 
-@router.get("/history/{session_id}")
-async def get_history(session_id: UUID, db: AsyncSession = Depends(get_db)):
-    return await RAGService.get_history(session_id, db)
+@router.get("/history", response_model=List[Union[ChatRead, ChatSummaryRead]])
+async def get_chats(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    view: ChatView = "full",
+    db: AsyncSession = Depends(get_db),
+):
+    chats, next_cursor = await RAGService.get_all_chats(
+        db=db, limit=limit, cursor=cursor, view=view
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    schema = ChatSummaryRead if view == "summary" else ChatRead
+    return [schema.model_validate(chat) for chat in chats]
+
+
+@router.get("/history/{session_id}", response_model=List[Union[ChatRead, ChatSummaryRead]])
+async def get_history(
+    session_id: UUID,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    view: ChatView = "full",
+    db: AsyncSession = Depends(get_db),
+):
+    chats, next_cursor = await RAGService.get_history(
+        session_id, db, limit=limit, cursor=cursor, view=view
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    schema = ChatSummaryRead if view == "summary" else ChatRead
+    return [schema.model_validate(chat) for chat in chats]
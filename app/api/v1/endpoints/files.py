@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 import uuid
 from fastapi import APIRouter
 from app.services.document.document import DocumentService
@@ -9,21 +9,37 @@ from app.db.database import get_db
 files_router = APIRouter(tags=["files"])
 
 
-from fastapi import APIRouter, UploadFile, Depends, Path as PathParam
+from fastapi import APIRouter, UploadFile, Depends, Query, Response, Path as PathParam
 from fastapi.responses import FileResponse
-from app.schemas.document import DocumentRead
+from app.schemas.document import DocumentStatusRead, DocumentSummary
+from app.services.pagination import NEXT_CURSOR_HEADER
+from app.services.ingestion.worker import ingestion_worker
 
 files_router = APIRouter(prefix="/files", tags=["Documents"])
 
-@files_router.post("", response_model=DocumentRead, status_code=201)
+@files_router.post("", response_model=DocumentSummary, status_code=201)
 async def upload_document(file: UploadFile, db: AsyncSession = Depends(get_db)):
-    return await DocumentService.upload_file(file, db)
+    record = await DocumentService.upload_file(file, db)
+    ingestion_worker.enqueue_unless_ready(record)
+    return record
+
+@files_router.get("/{file_id}/status", response_model=DocumentStatusRead)
+async def get_document_status(file_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    return await DocumentService.get_status(file_id, db)
 
 @files_router.get("/{file_id}/download")
 async def download_file(file_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
     record = await DocumentService.get_file_content(file_id, db)
     return FileResponse(path=record.file_path, filename=record.file_name)
 
-@files_router.get("", response_model=List[DocumentRead])
-async def list_documents(db: AsyncSession = Depends(get_db)):
-    return await DocumentService.get_all_files(db)
\ No newline at end of file
+@files_router.get("", response_model=List[DocumentSummary])
+async def list_documents(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    documents, next_cursor = await DocumentService.get_all_files(db, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [DocumentSummary.model_validate(document) for document in documents]
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from app.db.database import get_db
+from app.services.cache.lru import document_index_cache, question_embedding_cache
 
 router = APIRouter(tags=["health"])
 
@@ -17,3 +18,12 @@ async def readiness(db: AsyncSession = Depends(get_db)):
         return {"status": "ready"}
     except Exception:
         return {"status": "unready"}
+
+@router.get("/health/cache")
+async def cache_stats():
+    return {
+        "caches": [
+            document_index_cache.stats(),
+            question_embedding_cache.stats(),
+        ]
+    }
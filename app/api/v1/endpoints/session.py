@@ -1,9 +1,12 @@
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, Query, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.session.session import ChatSessionService
 from app.db.database import get_db
-from app.schemas.session import SessionSchema
+from app.schemas.chat import ChatView
+from app.schemas.session import SessionSchema, SessionSummaryRead
+from app.services.pagination import NEXT_CURSOR_HEADER
 
 session_router = APIRouter(prefix="/session",tags=["session"])
 
@@ -13,14 +16,34 @@ async def start_session(file: UploadFile = File(...), db: AsyncSession = Depends
     return await ChatSessionService.create_session(file, db)
 
 
-@session_router.get("")
-async def get_sessions(db: AsyncSession = Depends(get_db)):
-    return await ChatSessionService.get_sessions(db)
+@session_router.get("", response_model=List[SessionSummaryRead])
+async def get_sessions(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    sessions, next_cursor = await ChatSessionService.get_sessions(db, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [SessionSummaryRead.model_validate(session) for session in sessions]
 
 
 @session_router.get("/{session_id}", response_model=SessionSchema)
-async def get_session_content(session_id: UUID, db: AsyncSession = Depends(get_db)):
-    return await ChatSessionService.get_session(session_id, db)
+async def get_session_content(
+    session_id: UUID,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    view: ChatView = "full",
+    db: AsyncSession = Depends(get_db),
+):
+    content, next_cursor = await ChatSessionService.get_session_content(
+        session_id, db, limit=limit, cursor=cursor, view=view
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return content
 
 @session_router.delete("/{session_id}")
 async def delete_session(session_id: UUID, db:AsyncSession = Depends(get_db)):
@@ -1,3 +1,6 @@
+import os
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -11,8 +14,89 @@ class Settings(BaseSettings):
     db_name: str
     db_user: str
     db_password: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # openai | openai_compatible | stub
+    llm_backend: str = "openai"
+    embedding_backend: str = "openai"
+    chat_model: str = "gpt-4o"
+    summary_model: Optional[str] = None
+    embedding_model: str = "text-embedding-3-small"
+
+    OPENAI_API_KEY: str = ""
+    openai_base_url: Optional[str] = None
+    openai_timeout: float = 60.0
+    openai_max_retries: int = 2
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry: float = 30.0
+    compatible_base_url: Optional[str] = None
+    compatible_api_key: str = "not-needed"
+
+    stub_first_token_latency_ms: float = 300.0
+    stub_token_latency_ms: float = 15.0
+    stub_answer_tokens: int = 48
+    stub_embedding_latency_ms: float = 0.0
+
+    embedding_dim: int = 1536
+    embedding_batch_max_tokens: int = 8000
+    embedding_batch_max_size: int = 256
+    embedding_concurrency: int = 4
+    embedding_max_retries: int = 5
+    embedding_backoff_base: float = 0.5
+    embedding_backoff_max: float = 20.0
+    embedding_storage_dtype: str = "float32"
+    retrieval_backend: str = "memory"
+    memory_search_load_batch: int = 16
+    pgvector_ef_search: int = 40
+    hybrid_retrieval: bool = True
+    hybrid_candidates: int = 20
+    rrf_k: int = 60
+    context_candidates: int = 12
+    context_token_budget: int = 3000
+    history_token_budget: int = 1500
+    history_max_turns: int = 20
+    history_summary_min_tokens: int = 500
+    history_summary_max_tokens: int = 400
+    max_upload_size_mb: int = 100
+    chunker_mode: str = "token"
+    chunk_max_tokens: int = 512
+    chunk_overlap_tokens: int = 0
+
+    ingestion_workers: int = 2
+    extraction_workers: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    extraction_parallel_min_pages: int = 64
+    ingestion_error_max_length: int = 1000
+    ingestion_stale_seconds: float = 1800
+    chat_ingestion_wait_seconds: float = 10.0
+    chat_persist_batch_size: int = 100
+    chat_persist_flush_interval: float = 0.5
+    chat_persist_max_pending: int = 10000
+
+    vector_index_backend: str = "exact"
+    document_cache_max_mb: int = 512
+    document_cache_ttl_seconds: float = 3600
+    question_cache_max_mb: int = 64
+    question_cache_ttl_seconds: float = 3600
+    ivf_min_vectors: int = 4096
+    ivf_n_probe: int = 8
+
+    cache_backend: str = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    shared_cache_ttl_seconds: float = 86400
+    shared_cache_memory_max_mb: int = 256
+
+    answer_cache_enabled: bool = True
+    answer_cache_similarity: float = 0.97
+    answer_cache_candidates: int = 20
+
+    otel_enabled: bool = False
+    otel_exporter_endpoint: str = "http://localhost:4318/v1/traces"
 
-    OPENAI_API_KEY: str
     log_level: str = "INFO"
 
     @property
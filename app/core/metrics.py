@@ -0,0 +1,168 @@
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, Iterator
+
+from prometheus_client import REGISTRY, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core.config import settings
+
+try:
+    from opentelemetry import trace
+except ImportError:  # optional: tracing is off without the OpenTelemetry SDK
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+STAGE_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+STAGE_LATENCY = Histogram(
+    "rag_stage_duration_seconds",
+    "Duration of each stage of an operation (chat, upload, ingest).",
+    ["operation", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+CHAT_STREAMS_IN_FLIGHT = Gauge(
+    "rag_chat_streams_in_flight",
+    "Chat answers currently being streamed.",
+)
+
+_tracer = None
+_tracer_provider = None
+
+
+def init_tracing() -> None:
+    """Exports stage spans over OTLP/HTTP when otel_enabled and the SDK is installed."""
+    global _tracer, _tracer_provider
+    if not settings.otel_enabled or _tracer is not None:
+        return
+    if trace is None:
+        logger.warning("otel_enabled is set but opentelemetry is not installed; tracing is off")
+        return
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("opentelemetry-sdk or the OTLP exporter is missing; tracing is off")
+        return
+
+    _tracer_provider = TracerProvider(resource=Resource.create({"service.name": settings.app_name}))
+    _tracer_provider.add_span_processor(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.otel_exporter_endpoint))
+    )
+    trace.set_tracer_provider(_tracer_provider)
+    _tracer = trace.get_tracer("rag")
+
+
+def shutdown_tracing() -> None:
+    global _tracer, _tracer_provider
+    if _tracer_provider is not None:
+        _tracer_provider.shutdown()
+    _tracer = _tracer_provider = None
+
+
+def observe_stage(operation: str, stage: str, seconds: float) -> None:
+    STAGE_LATENCY.labels(operation, stage).observe(seconds)
+
+
+@contextmanager
+def stage_timer(operation: str, stage: str) -> Iterator[None]:
+    """
+    Times the enclosed block into rag_stage_duration_seconds and, with
+    tracing on, wraps it in a span. Not for blocks that yield across an
+    async generator; use observe_stage there.
+    """
+    span = _tracer.start_as_current_span(f"{operation}.{stage}") if _tracer else nullcontext()
+    start = time.perf_counter()
+    with span:
+        try:
+            yield
+        finally:
+            observe_stage(operation, stage, time.perf_counter() - start)
+
+
+class DBPoolCollector:
+    """Connection pool occupancy, read at scrape time."""
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+
+    def collect(self) -> Iterable:
+        pool = self.engine.sync_engine.pool
+        for name, doc, read in (
+            ("rag_db_pool_size", "Configured pool size.", pool.size),
+            ("rag_db_pool_checked_out", "Connections in use.", pool.checkedout),
+            ("rag_db_pool_checked_in", "Idle connections in the pool.", pool.checkedin),
+            # QueuePool counts overflow from -pool_size until the pool is full.
+            ("rag_db_pool_overflow", "Connections open beyond the pool size.",
+             lambda: max(pool.overflow(), 0)),
+        ):
+            yield GaugeMetricFamily(name, doc, value=read())
+
+
+class CacheCollector:
+    """LRUCache counters and sizes, labelled by cache name."""
+
+    def __init__(self, caches) -> None:
+        self.caches = caches
+
+    def collect(self) -> Iterable:
+        counters = {
+            field: CounterMetricFamily(f"rag_cache_{field}", f"In-process cache {field}.", labels=["cache"])
+            for field in ("hits", "misses", "evictions", "expirations")
+        }
+        gauges = {
+            field: GaugeMetricFamily(f"rag_cache_{field}", f"In-process cache {field}.", labels=["cache"])
+            for field in ("entries", "bytes", "max_bytes")
+        }
+        for cache in self.caches:
+            stats = cache.stats()
+            for field, metric in {**counters, **gauges}.items():
+                metric.add_metric([stats["name"]], stats[field])
+        yield from counters.values()
+        yield from gauges.values()
+
+
+class IngestionQueueCollector:
+    def __init__(self, worker) -> None:
+        self.worker = worker
+
+    def collect(self) -> Iterable:
+        yield GaugeMetricFamily(
+            "rag_ingestion_queue_depth",
+            "Documents queued or being ingested by this process.",
+            value=self.worker.pending,
+        )
+
+
+class ChatHistoryWriterCollector:
+    def __init__(self, writer) -> None:
+        self.writer = writer
+
+    def collect(self) -> Iterable:
+        yield GaugeMetricFamily(
+            "rag_chat_persist_queue_depth",
+            "Finished chat turns buffered and not yet written to chat_history.",
+            value=self.writer.pending,
+        )
+
+
+_registered = False
+
+
+def register_collectors(
+    engine, caches, ingestion_worker, chat_history_writer, registry=REGISTRY
+) -> None:
+    global _registered
+    if _registered:
+        return
+    registry.register(DBPoolCollector(engine))
+    registry.register(CacheCollector(caches))
+    registry.register(IngestionQueueCollector(ingestion_worker))
+    registry.register(ChatHistoryWriterCollector(chat_history_writer))
+    _registered = True
@@ -2,4 +2,5 @@ from app.db.base_class import Base
 
 from app.models.document_record import DocumentRecord
 from app.models.chat_record import ChatRecord
-from app.models.session import ChatSession
\ No newline at end of file
+from app.models.session import ChatSession
+from app.models.document_chunk import DocumentChunk
@@ -1,5 +1,7 @@
 from typing import AsyncIterator
 
+from pgvector.asyncpg import register_vector
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -8,12 +10,25 @@ from sqlalchemy.ext.asyncio import (
 
 from app.core.config import settings
 
+# Requests only hold a connection while they query: /chat releases its
+# session before streaming, so the pool bounds concurrent queries rather
+# than concurrent streams.
 engine = create_async_engine(
     settings.database_url,
     echo=False,
-    pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _register_vector_codec(dbapi_connection, connection_record):
+    dbapi_connection.run_async(register_vector)
+
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     expire_on_commit=False,
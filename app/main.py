@@ -1,13 +1,47 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.core.config import settings
 from app.core.logging import configure_logging
+from app.core.metrics import init_tracing, register_collectors, shutdown_tracing
+from app.db.database import engine
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
+from app.services.cache.backend import close_cache_backend, init_cache_backend
+from app.services.cache.lru import document_index_cache, question_embedding_cache
+from app.services.chat.document_processor import shutdown_extraction_pool
+from app.services.chat.persistence import chat_history_writer
+from app.services.ingestion.worker import ingestion_worker
+from app.services.pagination import NEXT_CURSOR_HEADER
+from app.services.llm.service import close_llm_backends, init_llm_backends
 
 
 configure_logging()
+register_collectors(
+    engine,
+    [document_index_cache, question_embedding_cache],
+    ingestion_worker,
+    chat_history_writer,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_tracing()
+    init_llm_backends()
+    init_cache_backend()
+    await ingestion_worker.start()
+    await chat_history_writer.start()
+    yield
+    await chat_history_writer.stop()
+    await ingestion_worker.stop()
+    shutdown_extraction_pool()
+    await close_cache_backend()
+    await close_llm_backends()
+    shutdown_tracing()
+
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 
 app.add_middleware(
@@ -16,6 +50,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(api_router)
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import Text, DateTime, func, ForeignKey
+from sqlalchemy import Text, DateTime, Index, LargeBinary, func, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
@@ -14,6 +14,12 @@ if TYPE_CHECKING:
 
 class ChatRecord(Base):
     __tablename__ = "chat_history"
+    __table_args__ = (
+        Index("ix_chat_history_document_id_sources_hash", "document_id", "sources_hash"),
+        # Keyset pagination on (created_at, id), globally and per session.
+        Index("ix_chat_history_session_id_created_at_id", "session_id", "created_at", "id"),
+        Index("ix_chat_history_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -22,11 +28,20 @@ class ChatRecord(Base):
         ForeignKey("chat_sessions.id", ondelete="CASCADE")
     )
 
+    document_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("documents.id", ondelete="CASCADE"), nullable=True
+    )
+
     question: Mapped[str] = mapped_column(Text)
     answer: Mapped[str] = mapped_column(Text)
     sources: Mapped[Optional[list]] = mapped_column(
         JSONB, server_default="[]"
     )
+    # Answer-cache key: the exact retrieved chunk set and the question vector.
+    sources_hash: Mapped[Optional[str]] = mapped_column(nullable=True)
+    question_embedding: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now()
     )
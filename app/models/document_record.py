@@ -1,8 +1,9 @@
+import enum
 from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
 import uuid
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, Index, LargeBinary, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
@@ -12,18 +13,60 @@ if TYPE_CHECKING:
     from app.models.session import ChatSession
 
 
+class DocumentStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
+
+
 class DocumentRecord(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     file_name: Mapped[str]
     file_path: Mapped[str] = mapped_column(nullable=True)
-    file_hash: Mapped[str] = mapped_column(index=True)
-    chunks: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
-    embeddings: Mapped[JSONB] = mapped_column(JSONB, nullable=True)
+    file_hash: Mapped[str] = mapped_column(index=True, unique=True)
+    # The extracted text, chunks and packed embeddings run to megabytes per
+    # document: they are never loaded with the row. Ingestion undefers what
+    # it needs, search reads them as explicit columns, and listings use
+    # page_count / chunk_count instead.
+    content: Mapped[Optional[str]] = mapped_column(
+        Text, nullable=True, deferred=True, deferred_raiseload=True
+    )
+    content_hash: Mapped[Optional[str]] = mapped_column(index=True, nullable=True)
+    page_offsets: Mapped[Optional[list]] = mapped_column(
+        JSONB, nullable=True, deferred=True, deferred_raiseload=True
+    )
+    chunks: Mapped[Optional[list]] = mapped_column(
+        JSONB, nullable=True, deferred=True, deferred_raiseload=True
+    )
+    chunk_spans: Mapped[Optional[list]] = mapped_column(
+        JSONB, nullable=True, deferred=True, deferred_raiseload=True
+    )
+    embeddings: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, deferred_raiseload=True
+    )
+    page_count: Mapped[Optional[int]] = mapped_column(nullable=True)
+    chunk_count: Mapped[Optional[int]] = mapped_column(nullable=True)
+    embedding_dim: Mapped[Optional[int]] = mapped_column(nullable=True)
+    embedding_dtype: Mapped[Optional[str]] = mapped_column(nullable=True)
     s3_url: Mapped[str] = mapped_column(nullable=True)
+    status: Mapped[str] = mapped_column(
+        default=DocumentStatus.PENDING.value,
+        server_default=DocumentStatus.PENDING.value,
+        index=True,
+    )
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # When the current ingestion claimed the row (status "processing").
+    ingestion_started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now()
     )
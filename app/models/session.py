@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, func, DateTime
+from sqlalchemy import ForeignKey, Index, Text, func, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -15,6 +15,9 @@ if TYPE_CHECKING:
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -26,6 +29,11 @@ class ChatSession(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now()
     )
+    # Rolling summary of every turn up to and including summary_until.
+    summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True
+    )
 
     document: Mapped["DocumentRecord"] = relationship(
         "DocumentRecord", back_populates="sessions"
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.schemas.document import DocumentRead, DocumentSchema
 
@@ -16,6 +16,10 @@ class ChatResponseSchema(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+# "summary" list views leave out answers and sources.
+ChatView = Literal["full", "summary"]
+
+
 class ChatBase(BaseModel):
     question: str
     answer: str
@@ -27,7 +31,16 @@ class ChatCreate(ChatBase):
 class ChatRead(ChatBase):
     id: UUID
     created_at: datetime
-    document_id: UUID
+    document_id: Optional[UUID] = None
     document: Optional[DocumentRead] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChatSummaryRead(BaseModel):
+    id: UUID
+    question: str
+    created_at: datetime
+    document_id: Optional[UUID] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -9,6 +9,7 @@ class DocumentSchema(BaseModel):
     file_name: str
     file_path: str
     chunks: Optional[list[str]]
+    status: str
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -20,3 +21,22 @@ class DocumentRead(DocumentSchema):
 
 class DocumentCreate(DocumentSchema):
     file_hash: str
+
+
+class DocumentSummary(BaseModel):
+    id: UUID
+    file_name: str
+    status: str
+    page_count: Optional[int] = None
+    chunk_count: Optional[int] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DocumentStatusRead(BaseModel):
+    id: UUID
+    status: str
+    error: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
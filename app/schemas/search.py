@@ -0,0 +1,21 @@
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class SearchRequest(BaseModel):
+    question: str
+    # None searches every ready document.
+    document_ids: Optional[List[UUID]] = None
+    top_k: int = Field(default=5, ge=1, le=100)
+
+
+class SearchHit(BaseModel):
+    document_id: UUID
+    ordinal: int
+    page_number: Optional[int] = None
+    text: str
+    score: float
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
 
 class DocumentMinimalRead(BaseModel):
     id: UUID
@@ -15,12 +15,26 @@ class ChatRecordRead(BaseModel):
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class ChatRecordSummaryRead(BaseModel):
+    id: UUID
+    question: str
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+class SessionSummaryRead(BaseModel):
+    id: UUID
+    document_id: UUID
+    title: str
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
 class SessionSchema(BaseModel):
     id: UUID
     document_id: UUID
     title: str
     created_at: datetime
     document: Optional[DocumentMinimalRead] = None 
-    messages: List[ChatRecordRead] = [] 
+    # One page of messages; the next page's cursor is in X-Next-Cursor.
+    messages: List[Union[ChatRecordRead, ChatRecordSummaryRead]] = []
 
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
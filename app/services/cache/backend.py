@@ -0,0 +1,166 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.services.cache import codec
+from app.services.cache.lru import MB, LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    Byte-level key/value store shared by every worker process. Values are
+    encoded with app.services.cache.codec by get_object/set_object.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+    async def get_object(self, key: str) -> Optional[Any]:
+        try:
+            data = await self.get(key)
+        except Exception:
+            logger.warning("Cache get failed for %s", key, exc_info=True)
+            return None
+        return codec.loads(data) if data is not None else None
+
+    async def set_object(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            await self.set(key, codec.dumps(value), ttl or settings.shared_cache_ttl_seconds)
+        except Exception:
+            logger.warning("Cache set failed for %s", key, exc_info=True)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Single-process stand-in for the shared backends."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._cache = LRUCache(
+            name="shared_memory",
+            max_bytes=max_bytes,
+            ttl_seconds=settings.shared_cache_ttl_seconds,
+            sizeof=len,
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._cache.put(key, value, ttl_seconds=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Any Redis-protocol server (Redis, Valkey, KeyDB, a local fake)."""
+
+    def __init__(self, url: str, prefix: str = "rag:") -> None:
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self._prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self._redis.set(
+            self._prefix + key, value, px=int(ttl * 1000) if ttl else None
+        )
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self._prefix + key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class PostgresCacheBackend(CacheBackend):
+    """
+    Stores entries in the UNLOGGED cache_entries table: shared by all
+    workers without WAL overhead, and emptied by Postgres after a crash.
+    """
+
+    PURGE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self) -> None:
+        self._last_purge = 0.0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                text(
+                    "SELECT value FROM cache_entries WHERE key = :key "
+                    "AND (expires_at IS NULL OR expires_at > now())"
+                ),
+                {"key": key},
+            )
+            return result.scalar_one_or_none()
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                text(
+                    "INSERT INTO cache_entries (key, value, expires_at) "
+                    "VALUES (:key, :value, now() + make_interval(secs => :ttl)) "
+                    "ON CONFLICT (key) DO UPDATE "
+                    "SET value = EXCLUDED.value, expires_at = EXCLUDED.expires_at"
+                ),
+                {"key": key, "value": value, "ttl": ttl or settings.shared_cache_ttl_seconds},
+            )
+            if time.monotonic() - self._last_purge > self.PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.monotonic()
+                await db.execute(text("DELETE FROM cache_entries WHERE expires_at < now()"))
+            await db.commit()
+
+    async def delete(self, key: str) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("DELETE FROM cache_entries WHERE key = :key"), {"key": key})
+            await db.commit()
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def init_cache_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        if settings.cache_backend == "memory":
+            _backend = MemoryCacheBackend(settings.shared_cache_memory_max_mb * MB)
+        elif settings.cache_backend == "redis":
+            _backend = RedisCacheBackend(settings.redis_url)
+        elif settings.cache_backend == "postgres":
+            _backend = PostgresCacheBackend()
+        else:
+            raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
+    return _backend
+
+
+def get_cache_backend() -> CacheBackend:
+    return _backend or init_cache_backend()
+
+
+async def close_cache_backend() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
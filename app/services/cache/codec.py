@@ -0,0 +1,65 @@
+import json
+import struct
+from typing import Any, List
+
+import numpy as np
+
+MAGIC = b"RC1"
+_HEADER_LEN = struct.Struct(">I")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serializes JSON-compatible values that may contain numpy arrays. Arrays
+    are replaced in the JSON header by placeholders and their raw buffers
+    are appended after it, so they load back as zero-copy views.
+    """
+    buffers: List[bytes] = []
+    arrays: List[dict] = []
+
+    def encode(obj: Any) -> Any:
+        if isinstance(obj, np.ndarray):
+            array = np.ascontiguousarray(obj)
+            arrays.append({"dtype": array.dtype.str, "shape": list(array.shape)})
+            buffers.append(array.tobytes())
+            return {"__ndarray__": len(arrays) - 1}
+        if isinstance(obj, dict):
+            return {key: encode(item) for key, item in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [encode(item) for item in obj]
+        return obj
+
+    header = json.dumps(
+        {"value": encode(value), "arrays": arrays}, separators=(",", ":")
+    ).encode("utf-8")
+    return MAGIC + _HEADER_LEN.pack(len(header)) + header + b"".join(buffers)
+
+
+def loads(data: bytes) -> Any:
+    if data[:3] != MAGIC:
+        raise ValueError("Unrecognized cache payload.")
+
+    (header_len,) = _HEADER_LEN.unpack_from(data, 3)
+    offset = 3 + _HEADER_LEN.size
+    header = json.loads(data[offset: offset + header_len])
+    offset += header_len
+
+    arrays = []
+    for spec in header["arrays"]:
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays.append(
+            np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(spec["shape"])
+        )
+        offset += count * dtype.itemsize
+
+    def decode(obj: Any) -> Any:
+        if isinstance(obj, dict):
+            if set(obj) == {"__ndarray__"}:
+                return arrays[obj["__ndarray__"]]
+            return {key: decode(item) for key, item in obj.items()}
+        if isinstance(obj, list):
+            return [decode(item) for item in obj]
+        return obj
+
+    return decode(header["value"])
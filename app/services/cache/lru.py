@@ -0,0 +1,115 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+MB = 1024 * 1024
+
+
+def _default_sizeof(value: Any) -> int:
+    return getattr(value, "nbytes", None) or sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    In-process cache bounded by total bytes, with least-recently-used
+    eviction and a per-entry TTL. Keeps hit/miss/eviction counters.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        ttl_seconds: float,
+        sizeof: Callable[[Any], int] = _default_sizeof,
+    ) -> None:
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, _, expires_at = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(
+        self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None
+    ) -> Any:
+        nbytes = self.sizeof(value)
+        if nbytes > self.max_bytes:
+            return value
+
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + (ttl_seconds or self.ttl_seconds)
+        self._entries[key] = (value, nbytes, expires_at)
+        self.current_bytes += nbytes
+
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, nbytes, _ = self._entries.pop(key)
+        self.current_bytes -= nbytes
+
+
+# Ready-to-search DocumentIndex objects, keyed by (document id, content hash).
+document_index_cache = LRUCache(
+    name="document_index",
+    max_bytes=settings.document_cache_max_mb * MB,
+    ttl_seconds=settings.document_cache_ttl_seconds,
+)
+
+# Question embeddings, keyed by a hash of the model and normalized question.
+question_embedding_cache = LRUCache(
+    name="question_embedding",
+    max_bytes=settings.question_cache_max_mb * MB,
+    ttl_seconds=settings.question_cache_ttl_seconds,
+)
@@ -0,0 +1,70 @@
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.cache.backend import get_cache_backend
+from app.services.rag import RAGService
+
+
+class AnswerCacheService:
+    """
+    Semantic answer cache. Entries for a (document, retrieved chunk set) pair
+    live in the shared cache backend; chat_history is the durable fallback.
+    """
+
+    @staticmethod
+    def _key(document_id: UUID, sources_hash: str) -> str:
+        return f"answer:{document_id}:{sources_hash}"
+
+    @staticmethod
+    async def lookup(
+        db: AsyncSession,
+        document_id: UUID,
+        sources_hash: str,
+        question_embedding: np.ndarray,
+    ) -> Optional[str]:
+        entry = await get_cache_backend().get_object(
+            AnswerCacheService._key(document_id, sources_hash)
+        )
+        if entry:
+            query = np.asarray(question_embedding, dtype=np.float32)
+            embeddings = entry["embeddings"]
+            similarities = embeddings @ query / (
+                np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query) + 1e-12
+            )
+            best = int(np.argmax(similarities))
+            if similarities[best] >= settings.answer_cache_similarity:
+                return entry["answers"][best]
+
+        return await RAGService.find_cached_answer(
+            db=db,
+            document_id=document_id,
+            sources_hash=sources_hash,
+            question_embedding=question_embedding,
+        )
+
+    @staticmethod
+    async def remember(
+        document_id: UUID,
+        sources_hash: str,
+        question_embedding: np.ndarray,
+        answer: str,
+    ) -> None:
+        backend = get_cache_backend()
+        key = AnswerCacheService._key(document_id, sources_hash)
+        entry = await backend.get_object(key) or {"embeddings": None, "answers": []}
+
+        vector = np.asarray(question_embedding, dtype=np.float32).reshape(1, -1)
+        embeddings = (
+            vector if entry["embeddings"] is None
+            else np.vstack([entry["embeddings"], vector])
+        )
+        answers = entry["answers"] + [answer]
+
+        keep = settings.answer_cache_candidates
+        await backend.set_object(
+            key, {"embeddings": embeddings[-keep:], "answers": answers[-keep:]}
+        )
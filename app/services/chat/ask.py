@@ -1,16 +1,28 @@
 import hashlib
-from typing import AsyncGenerator, Dict, Any, List
+import time
+from typing import AsyncGenerator, List, Optional
 from uuid import UUID
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTasks
 import numpy as np
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.llm.openai import OpenAIService
-from app.services.chat.chunks import ChunkService
-from app.services.chat.document_processor import DocumentProcessor
-from app.services.rag import RAGService
+from app.core.config import settings
+from app.core.metrics import CHAT_STREAMS_IN_FLIGHT, observe_stage, stage_timer
+from app.services.llm.service import LLMService
+from app.services.chat.context import ContextBlock, ContextService
+from app.services.chat.history import ConversationHistory, ConversationService
+from app.services.chat.persistence import chat_history_writer
+from app.services.chat.retrieval import ChunkHit, RetrievalService
+from app.services.cache.backend import get_cache_backend
+from app.services.cache.lru import question_embedding_cache
+from app.services.chat.answer_cache import AnswerCacheService
+from app.services.ingestion.worker import ingestion_worker
 from app.services.document.document import DocumentService
+from app.models.document_record import DocumentStatus
+
+REPLAY_CHUNK_SIZE = 64
 
 
 class ChatQuestionService:
@@ -22,13 +34,8 @@ class ChatQuestionService:
     - persistence of chat history
     """
 
-    def __init__(
-        self,
-        ai_service: OpenAIService,
-        chunk_service: ChunkService,
-    ) -> None:
+    def __init__(self, ai_service: LLMService) -> None:
         self.ai = ai_service
-        self.chunks = chunk_service
 
     async def process_and_ask(
         self,
@@ -39,162 +46,199 @@ class ChatQuestionService:
     ) :
         """
         Main RAG entrypoint:
-        - loads or caches document
+        - loads the ingested document
         - retrieves relevant chunks
         - queries LLM
         - persists result
         """
 
-        document = await self._load_document(UUID(file_id), db)
-        cached_doc = await self._get_or_create_cached_doc(
-            db=db,
-            document=document,
-        )
+        await chat_history_writer.wait_for_capacity()
+        with stage_timer("chat", "load_document"):
+            document = await self._load_document(UUID(file_id), db)
+        with stage_timer("chat", "load_history"):
+            history = await ConversationService.load(db, UUID(session_id))
+        # Give the connection back while the embedding API is called; the
+        # session checks out another one if retrieval needs the database.
+        await db.close()
+
+        with stage_timer("chat", "embed_question"):
+            question_embedding = await self._embed_question(question)
+
+        with stage_timer("chat", "retrieve"):
+            context_blocks = await self._retrieve_relevant_chunks(
+                db=db,
+                document=document,
+                question=question,
+                question_embedding=question_embedding,
+            )
 
-        question_embedding = self._embed_question(question)
+        context = ContextService.render(context_blocks)
+
+        sources = [block.text for block in context_blocks]
+        sources_hash = hashlib.md5(
+            "\x1f".join(sources).encode("utf-8")
+        ).hexdigest()
+        # A follow-up's answer depends on the conversation, not only on the
+        # question and sources, so only standalone questions use the cache.
+        use_answer_cache = settings.answer_cache_enabled and not history
+        cached_answer = None
+        if use_answer_cache:
+            with stage_timer("chat", "answer_cache_lookup"):
+                cached_answer = await AnswerCacheService.lookup(
+                    db=db,
+                    document_id=document.id,
+                    sources_hash=sources_hash,
+                    question_embedding=question_embedding,
+                )
+
+        # The stream can outlive the pool timeout many times over: it holds
+        # no connection, and the answer is persisted by the history writer.
+        await db.close()
+
+        # Run once the body is sent; the stream may add the answer-cache write.
+        background = BackgroundTasks()
+        background.add_task(ConversationService.refresh_summary, UUID(session_id), self.ai)
 
-        relevant_chunks = self._retrieve_relevant_chunks(
+        generator = self._generate_answer(
+            session_id=UUID(session_id),
+            document_id=document.id,
+            sources=sources,
+            sources_hash=sources_hash,
+            context=context,
+            question=question,
             question_embedding=question_embedding,
-            chunks=cached_doc["chunks"],
-            embeddings=cached_doc["embeddings"],
+            history=history,
+            use_answer_cache=use_answer_cache,
+            cached_answer=cached_answer,
+            background=background,
         )
 
-        context = "\n\n".join(relevant_chunks)
+        return StreamingResponse(
+            generator,
+            media_type="text/plain",
+            background=background,
+        )
 
-        generator = self._generate_answer(
+    async def search(
+        self,
+        question: str,
+        db: AsyncSession,
+        document_ids: Optional[List[UUID]] = None,
+        top_k: int = 5,
+    ) -> List[ChunkHit]:
+        """Retrieval only, across the given documents or the whole corpus."""
+        question_embedding = await self._embed_question(question)
+        return await RetrievalService.search(
             db=db,
-            session_id=UUID(session_id),
-            sources=relevant_chunks,
-            context=context,
             question=question,
+            question_embedding=question_embedding,
+            document_ids=document_ids,
+            top_k=top_k,
         )
-        # document_id=cached_doc["doc_id"],
-
-        # await self._persist_chat(
-        #     db=db,
-        #     session_id=UUID(session_id),
-        #     question=question,
-        #     answer=text_data,
-        #     sources=relevant_chunks,
-        #     document_id=cached_doc["doc_id"],
-        # )
-        return StreamingResponse(generator, media_type="text/plain")
 
     async def _load_document(
         self,
         file_id: UUID,
         db: AsyncSession,
-    ) -> Dict[str, Any]:
-        file_data = await DocumentService.get_record(
+    ):
+        """Status-only lookup; the heavy columns are read on an index cache miss."""
+        document = await DocumentService.get_status(
             file_id=file_id,
             db=db,
         )
 
-        if not file_data or not file_data.get("content"):
-            raise HTTPException(
-                status_code=404,
-                detail="Document not found or empty.",
+        # Join the in-flight ingestion instead of failing straight away.
+        if document.status in (
+            DocumentStatus.PENDING.value,
+            DocumentStatus.PROCESSING.value,
+        ) and await ingestion_worker.wait(file_id, settings.chat_ingestion_wait_seconds):
+            document = await DocumentService.get_status(
+                file_id=file_id,
+                db=db,
             )
 
-        content: str = file_data["content"]
-        file_hash = hashlib.md5(content.encode("utf-8")).hexdigest()
-
-        return {
-            "file_name": file_data["file_name"],
-            "file_path": file_data["file_path"],
-            "file_hash": file_hash,
-        }
-
-    async def _get_or_create_cached_doc(
-        self,
-        db: AsyncSession,
-        document: Dict[str, Any],
-    ) -> Dict[str, Any]:
-        """
-        Ensures document embeddings are computed once and cached forever.
-        """
-
-        existing_doc = await RAGService.get_existing_doc(
-            db=db,
-            file_hash=document["file_hash"],
-        )
-
-        if existing_doc:
-            return {
-                "doc_id": existing_doc.id,
-                "chunks": existing_doc.chunks,
-                "embeddings": np.array(existing_doc.embeddings),
-            }
-
-        # Cache miss → extract, chunk, embed
-        extracted_text = self._extract_text(
-            file_name=document["file_name"],
-        )
+        if document.status == DocumentStatus.FAILED.value:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Document ingestion failed: {document.error}",
+            )
 
-        chunks = self.chunks.simple_chunker(text=extracted_text)
+        if document.status != DocumentStatus.READY.value:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Document is still being processed ({document.status}).",
+            )
 
-        embeddings = self.ai.get_embeddings(chunks)
+        return document
 
-        new_doc = await RAGService.create_document_entry(
-            db=db,
-            file_name=document["file_name"],
-            file_hash=document["file_hash"],
-            chunks=chunks,
-            embeddings=embeddings,
-        )
+    async def _embed_question(self, question: str) -> np.ndarray:
+        normalized = " ".join(question.lower().split())
+        key = hashlib.sha256(
+            f"{self.ai.embedding_model}\n{normalized}".encode("utf-8")
+        ).hexdigest()
+        cached = question_embedding_cache.get(key)
+        if cached is not None:
+            return cached
 
-        return {
-            "doc_id": new_doc.id,
-            "chunks": chunks,
-            "embeddings": np.array(embeddings),
-        }
-
-    def _extract_text(self, file_name: str) -> str:
-        extension = file_name.split(".")[-1].lower()
-        return DocumentProcessor.extract_text(
-            extension=extension,
-            filename=file_name
-        )
+        shared_cache = get_cache_backend()
+        shared = await shared_cache.get_object(f"qemb:{key}")
+        if shared is not None:
+            return question_embedding_cache.put(key, shared)
 
-    def _embed_question(self, question: str) -> np.ndarray:
-        embeddings = self.ai.get_embeddings([question])
+        embeddings = await self.ai.get_embeddings([question])
         if not embeddings:
             raise HTTPException(
                 status_code=422,
                 detail="Failed to embed question.",
             )
-        return np.array(embeddings[0])
+        vector = np.asarray(embeddings[0], dtype=np.float32)
+        await shared_cache.set_object(f"qemb:{key}", vector)
+        return question_embedding_cache.put(key, vector)
 
-    def _retrieve_relevant_chunks(
+    async def _retrieve_relevant_chunks(
         self,
+        db: AsyncSession,
+        document,
+        question: str,
         question_embedding: np.ndarray,
-        chunks: List[str],
-        embeddings: np.ndarray,
-    ) -> List[str]:
-        return self.chunks.get_most_relevant_chunks(
-            question_vector=question_embedding,
-            chunk_vectors=embeddings,
-            chunks=chunks,
+    ) -> List[ContextBlock]:
+        """Over-retrieves candidates, then packs them into the context token budget."""
+        hits = await RetrievalService.search(
+            db=db,
+            question=question,
+            question_embedding=question_embedding,
+            document_ids=[document.id],
+            top_k=settings.context_candidates,
+            documents=[document],
         )
+        return ContextService.build(hits)
 
     async def _generate_answer(
         self,
-        db: AsyncSession,
         session_id: UUID,
+        document_id: UUID,
         sources: List[str],
-        # document_id: str,
+        sources_hash: str,
         context: str,
         question: str,
+        question_embedding: np.ndarray,
+        history: Optional[ConversationHistory] = None,
+        use_answer_cache: bool = False,
+        cached_answer: Optional[str] = None,
+        background: Optional[BackgroundTasks] = None,
     ) -> AsyncGenerator[str, None]:
         try:
             full_answer = ""
-            generator = self.ai.ask_question_about_document(
-                db,
-                session_id,
-                sources,
-                context_text=context,
-                user_question=question,
-            )
+            if cached_answer:
+                generator = self._replay_answer(cached_answer)
+            else:
+                generator = self.ai.ask_question_about_document(
+                    session_id,
+                    sources,
+                    context_text=context,
+                    user_question=question,
+                    history=history.to_messages() if history else None,
+                )
         except Exception as exc:
             raise HTTPException(
                 status_code=500,
@@ -204,40 +248,64 @@ class ChatQuestionService:
         if not generator:
             raise HTTPException(400, detail="No answer generated")
 
-        async for chunk in generator:
-            full_answer += chunk
-            yield chunk
-        
-        await RAGService.create_chat_entry(
-            db=db,
-            session_id=session_id,
-            query=question,
-            answer=full_answer,
-            sources=sources,
-        )
-
+        stage = "generate_cached" if cached_answer else "generate"
+        CHAT_STREAMS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        completed = False
+        try:
+            async for chunk in generator:
+                if not full_answer:
+                    observe_stage("chat", "first_token", time.perf_counter() - start)
+                full_answer += chunk
+                yield chunk
+            completed = True
+        finally:
+            CHAT_STREAMS_IN_FLIGHT.dec()
+            # Runs on client disconnect too: the turn is recorded as far as
+            # it was streamed. submit() only buffers, it never awaits.
+            if full_answer:
+                chat_history_writer.submit(
+                    session_id=session_id,
+                    question=question,
+                    answer=full_answer,
+                    sources=sources,
+                    document_id=document_id,
+                    # Follow-up, cut-off and replayed answers are never
+                    # answer-cache candidates.
+                    sources_hash=(
+                        None if history or cached_answer or not completed
+                        else sources_hash
+                    ),
+                    question_embedding=question_embedding,
+                )
+        observe_stage("chat", stage, time.perf_counter() - start)
+
+        if use_answer_cache and not cached_answer and background is not None:
+            background.add_task(
+                self._remember_answer,
+                document_id=document_id,
+                sources_hash=sources_hash,
+                question_embedding=question_embedding,
+                answer=full_answer,
+            )
 
-    async def _persist_chat(
-        self,
-        db: AsyncSession,
-        session_id: UUID,
-        question: str,
+    @staticmethod
+    async def _remember_answer(
+        document_id: UUID,
+        sources_hash: str,
+        question_embedding: np.ndarray,
         answer: str,
-        sources: List[str],
-        document_id: str,
-    ) -> Dict[str, Any]:
-        chat_entry = await RAGService.create_chat_entry(
-            db=db,
-            session_id=session_id,
-            query=question,
-            answer=answer,
-            sources=sources,
-        )
+    ) -> None:
+        with stage_timer("chat", "answer_cache"):
+            await AnswerCacheService.remember(
+                document_id=document_id,
+                sources_hash=sources_hash,
+                question_embedding=question_embedding,
+                answer=answer,
+            )
 
-        return {
-            "id": chat_entry.id,
-            "question": question,
-            "answer": answer,
-            "sources": sources,
-            "document_id": document_id,
-        }
+    @staticmethod
+    async def _replay_answer(answer: str) -> AsyncGenerator[str, None]:
+        """Streams a cached answer through the same interface as the LLM."""
+        for i in range(0, len(answer), REPLAY_CHUNK_SIZE):
+            yield answer[i: i + REPLAY_CHUNK_SIZE]
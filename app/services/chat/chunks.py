@@ -1,6 +1,41 @@
-import hashlib
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import bisect
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from app.core.config import settings
+from app.services.llm.tokens import count_tokens
+
+_PARAGRAPH_RE = re.compile(r"[^\n](?:[^\n]|\n(?!\n))*")
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.!?](?=\s)|$)", re.DOTALL)
+_WORD_RE = re.compile(r"\S+")
+_NUMBERED_HEADING_RE = re.compile(
+    r"^(?:(?:item|part|section|note|article|schedule)\s+\w+|\d+(?:\.\d+)*)[.):]?\s+\S",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class Chunk:
+    text: str
+    page: int
+    start: int
+    end: int
+
+
+@dataclass
+class _Unit:
+    start: int
+    end: int
+    tokens: int
+    heading: bool = False
+
+
+def _is_heading(line: str) -> bool:
+    line = line.strip()
+    if not 0 < len(line) <= 80 or line[-1] in ".,;:":
+        return False
+    return line.isupper() or bool(_NUMBERED_HEADING_RE.match(line))
 
 
 class ChunkService:
@@ -16,43 +51,112 @@ class ChunkService:
         return chunks
 
     @staticmethod
-    def get_most_relevant_chunks(question_vector, chunk_vectors, chunks, top_k=3):
-
-        if not chunks or not isinstance(chunks, list):
-            return []
-
-        if chunk_vectors is None or len(chunk_vectors) == 0:
-            # Filter out None/Empty strings
-            return [c for c in chunks[:top_k] if c]
+    def chunk_document(
+        text: str,
+        page_offsets: Optional[List[int]] = None,
+        mode: Optional[str] = None,
+    ) -> List[Chunk]:
+        """Chunks a document with the configured chunker, keeping page provenance."""
+        mode = mode or settings.chunker_mode
+        page_offsets = page_offsets or [0]
 
-        try:
-            # Ensure numeric conversion
-            q_vector = np.array(
-                question_vector, dtype=np.float32).reshape(1, -1)
-            c_vectors = np.array(chunk_vectors, dtype=np.float32)
+        if mode == "simple":
+            step = 1000 - 200
+            return [
+                Chunk(
+                    text=chunk,
+                    page=bisect.bisect_right(page_offsets, i * step),
+                    start=i * step,
+                    end=i * step + len(chunk),
+                )
+                for i, chunk in enumerate(ChunkService.simple_chunker(text))
+            ]
+        if mode == "token":
+            return ChunkService.token_chunker(text, page_offsets)
+        raise ValueError(f"Unknown chunker mode: {mode}")
 
-            # Handle 1D vs 2D
-            if c_vectors.ndim == 1:
-                c_vectors = c_vectors.reshape(1, -1)
+    @staticmethod
+    def token_chunker(
+        text: str,
+        page_offsets: List[int],
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+    ) -> List[Chunk]:
+        """
+        Packs paragraphs into chunks of at most max_tokens. Chunks never span
+        a page break, a heading always starts a new chunk, and paragraphs are
+        only split (at sentences, then words) when they alone exceed the
+        budget.
+        """
+        max_tokens = max_tokens or settings.chunk_max_tokens
+        overlap_tokens = (
+            settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+        )
+        if not text:
+            return []
 
-            # Calculate similarity
-            similarities = cosine_similarity(q_vector, c_vectors)[0]
+        chunks: List[Chunk] = []
+        bounds = list(page_offsets) + [len(text)]
+        for page, (page_start, page_end) in enumerate(zip(bounds, bounds[1:]), start=1):
+            current: List[_Unit] = []
+            current_tokens = 0
+            for unit in ChunkService._units(text, page_start, page_end, max_tokens):
+                if current and (unit.heading or current_tokens + unit.tokens > max_tokens):
+                    chunks.append(ChunkService._make_chunk(text, page, current))
+                    current = [] if unit.heading else ChunkService._overlap_tail(
+                        current, overlap_tokens, max_tokens - unit.tokens
+                    )
+                    current_tokens = sum(u.tokens for u in current)
+                current.append(unit)
+                current_tokens += unit.tokens
+            if current:
+                chunks.append(ChunkService._make_chunk(text, page, current))
+        return chunks
 
-            # Guard: Ensure we don't try to sort more than we have
-            actual_k = min(top_k, len(similarities), len(chunks))
+    @staticmethod
+    def _units(text: str, start: int, end: int, max_tokens: int) -> Iterator[_Unit]:
+        """Paragraphs of text[start:end], with headings and oversized paragraphs broken out."""
+        for paragraph in _PARAGRAPH_RE.finditer(text, start, end):
+            p_start, p_end = paragraph.span()
+            first_line_end = text.find("\n", p_start, p_end)
+            first_line_end = p_end if first_line_end == -1 else first_line_end
 
-            # Get top indices
-            top_indices = np.argsort(similarities)[-actual_k:][::-1]
+            if _is_heading(text[p_start:first_line_end]):
+                yield _Unit(p_start, first_line_end, count_tokens(text[p_start:first_line_end]), heading=True)
+                p_start = first_line_end + 1
+                if p_start >= p_end:
+                    continue
 
-            # Extract relevant text, ensuring we don't return None or empty strings
-            results = []
-            for i in top_indices:
-                if i < len(chunks) and chunks[i]:
-                    results.append(chunks[i])
+            tokens = count_tokens(text[p_start:p_end])
+            if tokens <= max_tokens:
+                yield _Unit(p_start, p_end, tokens)
+                continue
 
-            return results
+            for sentence in _SENTENCE_RE.finditer(text, p_start, p_end):
+                s_start, s_end = sentence.span()
+                tokens = count_tokens(text[s_start:s_end])
+                if tokens <= max_tokens:
+                    yield _Unit(s_start, s_end, tokens)
+                    continue
+                # Last resort for run-on text: word windows, long tokens cut by characters.
+                step = max_tokens * 4
+                for word in _WORD_RE.finditer(text, s_start, s_end):
+                    for w_start in range(word.start(), word.end(), step):
+                        w_end = min(w_start + step, word.end())
+                        yield _Unit(w_start, w_end, count_tokens(text[w_start:w_end]))
 
-        except Exception as e:
+    @staticmethod
+    def _overlap_tail(units: List[_Unit], overlap_tokens: int, room: int) -> List[_Unit]:
+        tail: List[_Unit] = []
+        tokens = 0
+        for unit in reversed(units):
+            if tokens + unit.tokens > min(overlap_tokens, room):
+                break
+            tail.insert(0, unit)
+            tokens += unit.tokens
+        return tail
 
-            # Final safety fallback: Return first chunks
-            return [c for c in chunks[:top_k] if c]
+    @staticmethod
+    def _make_chunk(text: str, page: int, units: List[_Unit]) -> Chunk:
+        start, end = units[0].start, units[-1].end
+        return Chunk(text=text[start:end], page=page, start=start, end=end)
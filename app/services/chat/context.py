@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.chat.retrieval import ChunkHit
+from app.services.llm.tokens import count_tokens
+
+BLOCK_SEPARATOR = "\n\n"
+# Chunks are cut at whitespace, so neighbours are at most a paragraph or
+# page separator apart.
+MAX_MERGE_GAP = 2
+
+
+@dataclass
+class ContextBlock:
+    document_id: UUID
+    page_number: Optional[int]
+    start: Optional[int]
+    end: Optional[int]
+    text: str
+    score: float
+    tokens: int = 0
+
+
+class ContextService:
+    """
+    Turns retrieved chunks into the prompt context: overlapping and
+    adjacent windows of the same document are merged into one block,
+    repeated text is dropped, and the best-scoring blocks are packed
+    greedily into a token budget, then laid out in reading order.
+    """
+
+    @staticmethod
+    def build(hits: Sequence[ChunkHit], token_budget: Optional[int] = None) -> List[ContextBlock]:
+        budget = settings.context_token_budget if token_budget is None else token_budget
+        blocks = ContextService._merge(hits, budget)
+
+        separator_tokens = count_tokens(BLOCK_SEPARATOR)
+        selected: List[ContextBlock] = []
+        used = 0
+        for block in sorted(blocks, key=lambda b: b.score, reverse=True):
+            cost = block.tokens + (separator_tokens if selected else 0)
+            if used + cost <= budget:
+                selected.append(block)
+                used += cost
+
+        if not selected and blocks:
+            # Even the best block alone is over budget: send a cut of it
+            # rather than no context at all.
+            best = max(blocks, key=lambda b: b.score)
+            while best.text and best.tokens > budget:
+                best.text = best.text[: len(best.text) * budget // (best.tokens + 1)]
+                best.tokens = count_tokens(best.text)
+            selected.append(best)
+
+        # Documents by their best block, then reading order within each.
+        doc_rank: Dict[UUID, float] = {}
+        for block in selected:
+            doc_rank[block.document_id] = max(doc_rank.get(block.document_id, block.score), block.score)
+        selected.sort(key=lambda b: (
+            -doc_rank[b.document_id],
+            str(b.document_id),
+            b.page_number or 0,
+            b.start or 0,
+        ))
+        return selected
+
+    @staticmethod
+    def render(blocks: Sequence[ContextBlock]) -> str:
+        return BLOCK_SEPARATOR.join(block.text for block in blocks)
+
+    @staticmethod
+    def _merge(hits: Sequence[ChunkHit], budget: int) -> List[ContextBlock]:
+        """Merges overlapping or adjacent windows while the merged block still fits the budget."""
+        seen_texts = set()
+        unique: List[ChunkHit] = []
+        for hit in hits:
+            key = " ".join(hit.text.split())
+            if key and key not in seen_texts:
+                seen_texts.add(key)
+                unique.append(hit)
+
+        with_spans = sorted(
+            (hit for hit in unique if hit.start_char is not None and hit.end_char is not None),
+            key=lambda hit: (str(hit.document_id), hit.start_char),
+        )
+        blocks: List[ContextBlock] = [
+            ContextBlock(
+                document_id=hit.document_id,
+                page_number=hit.page_number,
+                start=None,
+                end=None,
+                text=hit.text,
+                score=hit.score,
+                tokens=count_tokens(hit.text),
+            )
+            for hit in unique
+            if hit.start_char is None or hit.end_char is None
+        ]
+
+        current: Optional[ContextBlock] = None
+        for hit in with_spans:
+            if (
+                current is not None
+                and current.document_id == hit.document_id
+                and hit.start_char <= current.end + MAX_MERGE_GAP
+            ):
+                if hit.end_char <= current.end:
+                    current.score = max(current.score, hit.score)
+                    continue
+                gap = hit.start_char - current.end
+                if gap > 0:
+                    extension = ("\n\n" if gap > 1 else " ") + hit.text
+                else:
+                    extension = hit.text[-gap:]
+                extension_tokens = count_tokens(extension)
+                if current.tokens + extension_tokens <= budget:
+                    current.text += extension
+                    current.end = hit.end_char
+                    current.tokens += extension_tokens
+                    current.score = max(current.score, hit.score)
+                    continue
+
+            current = ContextBlock(
+                document_id=hit.document_id,
+                page_number=hit.page_number,
+                start=hit.start_char,
+                end=hit.end_char,
+                text=hit.text,
+                score=hit.score,
+                tokens=count_tokens(hit.text),
+            )
+            blocks.append(current)
+        return blocks
@@ -1,11 +1,68 @@
+import asyncio
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
 import pymupdf
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.extraction_workers)
+    return _executor
+
+
+def shutdown_extraction_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
 
 
 class DocumentProcessor:
+    """
+    The single PDF extraction engine. Each file is parsed once into per-page
+    text; large files are split into page ranges parsed in parallel worker
+    processes.
+    """
+
+    @staticmethod
+    def page_count(filename: str) -> int:
+        with pymupdf.open(filename) as doc:
+            return doc.page_count
+
     @staticmethod
-    def extract_text(filename: str, extension: str) -> str:
-        text_parts = []
-        with pymupdf.open(filename=filename, filetype=extension) as doc:
-            for page in doc:
-                text_parts.append(page.get_text())
-        return "\n".join(text_parts)
+    def extract_page_range(filename: str, start: int, stop: int) -> List[str]:
+        with pymupdf.open(filename) as doc:
+            return [doc[i].get_text() for i in range(start, stop)]
+
+    @staticmethod
+    async def extract_pages(filename: str) -> List[str]:
+        """Returns the text of every page; element i is page i + 1."""
+        page_count = await run_in_threadpool(DocumentProcessor.page_count, filename)
+        workers = settings.extraction_workers
+        if page_count < settings.extraction_parallel_min_pages or workers < 2:
+            return await run_in_threadpool(
+                DocumentProcessor.extract_page_range, filename, 0, page_count
+            )
+
+        step = math.ceil(page_count / workers)
+        loop = asyncio.get_running_loop()
+        pool = get_extraction_pool()
+        ranges = await asyncio.gather(*(
+            loop.run_in_executor(
+                pool,
+                DocumentProcessor.extract_page_range,
+                filename,
+                start,
+                min(start + step, page_count),
+            )
+            for start in range(0, page_count, step)
+        ))
+        return [page for pages in ranges for page in pages]
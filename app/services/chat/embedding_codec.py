@@ -0,0 +1,45 @@
+import numpy as np
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+
+def encode_embeddings(vectors, dtype: str = "float32") -> bytes:
+    """
+    Packs a (n_chunks, dim) matrix into a contiguous byte string.
+
+    int8 uses symmetric per-row quantization: the n float32 row scales are
+    stored first, followed by the n * dim quantized values.
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+
+    if dtype == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+        return scales.astype(np.float32).tobytes() + quantized.tobytes()
+
+    return matrix.astype(dtype).tobytes()
+
+
+def decode_embeddings(blob: bytes, dim: int, dtype: str = "float32") -> np.ndarray:
+    """
+    Returns the (n_chunks, dim) matrix stored in blob. float32 and float16
+    are read-only views over the buffer; int8 is dequantized to float32.
+    """
+    if dtype == "int8":
+        n_rows = len(blob) // (4 + dim)
+        scales = np.frombuffer(blob, dtype=np.float32, count=n_rows)
+        quantized = np.frombuffer(
+            blob, dtype=np.int8, offset=4 * n_rows
+        ).reshape(n_rows, dim)
+        return quantized * scales[:, None]
+
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    return np.frombuffer(blob, dtype=dtype).reshape(-1, dim)
@@ -0,0 +1,191 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.chat_record import ChatRecord
+from app.models.session import ChatSession
+from app.services.chat.persistence import chat_history_writer
+from app.services.llm.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Role markers and message framing per turn.
+TURN_OVERHEAD_TOKENS = 8
+
+
+@dataclass
+class ConversationHistory:
+    summary: Optional[str] = None
+    # (question, answer) pairs, oldest first.
+    turns: List[Tuple[str, str]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.summary or self.turns)
+
+    def to_messages(self) -> List[Dict[str, str]]:
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{self.summary}",
+            })
+        for question, answer in self.turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+
+class ConversationService:
+    """
+    Bounded session memory for the chat prompt: the most recent turns that
+    fit history_token_budget, plus a rolling summary of everything older.
+    The summary is stored on the session and only ever extended, so each
+    turn is summarized once. Older turns waiting to be summarized are sent
+    as they are, up to history_summary_min_tokens.
+    """
+
+    @staticmethod
+    def _turn_tokens(question: str, answer: str) -> int:
+        return count_tokens(question) + count_tokens(answer) + TURN_OVERHEAD_TOKENS
+
+    @staticmethod
+    def _split_recent(rows: Sequence, budget: int) -> int:
+        """Index into rows (newest first, question and answer leading) of the first turn over the budget."""
+        used = 0
+        for i, (question, answer, *_) in enumerate(rows):
+            used += ConversationService._turn_tokens(question, answer)
+            if used > budget:
+                return i
+        return len(rows)
+
+    @staticmethod
+    async def load(db: AsyncSession, session_id: UUID) -> ConversationHistory:
+        result = await db.execute(
+            select(ChatSession.summary, ChatSession.summary_until)
+            .where(ChatSession.id == session_id)
+        )
+        session = result.one_or_none()
+        if session is None:
+            return ConversationHistory()
+
+        # The turns not yet in the summary: the recent window, plus any that
+        # have fallen out of it but are still short of the folding threshold.
+        stmt = (
+            select(ChatRecord.question, ChatRecord.answer)
+            .where(ChatRecord.session_id == session_id)
+            .order_by(ChatRecord.created_at.desc())
+            .limit(settings.history_max_turns * 2)
+        )
+        if session.summary_until is not None:
+            stmt = stmt.where(ChatRecord.created_at > session.summary_until)
+        rows = [(row.question, row.answer) for row in (await db.execute(stmt)).all()]
+        # Turns still waiting in the write-behind buffer are the newest ones.
+        # Only this process's buffer is visible: on another worker, a turn
+        # shows up once flushed, at most chat_persist_flush_interval later.
+        pending = chat_history_writer.pending_turns(session_id)
+        rows = [(turn.question, turn.answer) for turn in reversed(pending)] + rows
+
+        window = min(
+            ConversationService._split_recent(rows, settings.history_token_budget),
+            settings.history_max_turns,
+        )
+        unsummarized = ConversationService._fit_overflow(
+            rows[window:], settings.history_summary_min_tokens
+        )
+        return ConversationHistory(
+            summary=session.summary,
+            turns=list(reversed(rows[:window] + unsummarized)),
+        )
+
+    @staticmethod
+    def _fit_overflow(rows: Sequence, budget: int) -> List[Tuple[str, str]]:
+        """
+        Out-of-window turns (newest first) that refresh_summary has not
+        folded in yet, kept within budget so the model does not lose them
+        meanwhile. The oldest turn that does not fit has its answer cut.
+        """
+        kept: List[Tuple[str, str]] = []
+        used = 0
+        for question, answer in rows:
+            tokens = ConversationService._turn_tokens(question, answer)
+            if used + tokens > budget:
+                room = budget - used - ConversationService._turn_tokens(question, "")
+                answer_tokens = count_tokens(answer)
+                while answer and answer_tokens > room > 0:
+                    answer = answer[: len(answer) * room // (answer_tokens + 1)]
+                    answer_tokens = count_tokens(answer)
+                if room > 0 and answer:
+                    kept.append((question, answer + " …"))
+                break
+            kept.append((question, answer))
+            used += tokens
+        return kept
+
+    @staticmethod
+    async def refresh_summary(session_id: UUID, ai) -> None:
+        """
+        Folds the turns that have fallen out of the recent window into the
+        session summary once they add up to history_summary_min_tokens.
+        Runs after the response is sent, with its own DB session.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(ChatSession.summary, ChatSession.summary_until)
+                    .where(ChatSession.id == session_id)
+                )
+                session = result.one_or_none()
+                if session is None:
+                    return
+
+                stmt = (
+                    select(ChatRecord.question, ChatRecord.answer, ChatRecord.created_at)
+                    .where(ChatRecord.session_id == session_id)
+                    .order_by(ChatRecord.created_at.desc())
+                )
+                if session.summary_until is not None:
+                    stmt = stmt.where(ChatRecord.created_at > session.summary_until)
+                rows = (await db.execute(stmt)).all()
+                # The turn that triggered this task is usually still in the
+                # write-behind buffer; count it, as load() does, so both see
+                # the same window. summary_until may then be a buffered
+                # turn's created_at, which is stamped before it is written.
+                pending = chat_history_writer.pending_turns(session_id)
+                rows = list(reversed(pending)) + list(rows)
+
+                window = min(
+                    ConversationService._split_recent(rows, settings.history_token_budget),
+                    settings.history_max_turns,
+                )
+                overflow = list(reversed(rows[window:]))
+                overflow_tokens = sum(
+                    ConversationService._turn_tokens(row.question, row.answer) for row in overflow
+                )
+                if not overflow or overflow_tokens < settings.history_summary_min_tokens:
+                    return
+
+                summary = await ai.summarize_conversation(
+                    previous_summary=session.summary,
+                    turns=[(row.question, row.answer) for row in overflow],
+                )
+                summary_until: datetime = overflow[-1].created_at
+
+                # Another request may have folded the same turns meanwhile.
+                await db.execute(
+                    update(ChatSession)
+                    .where(
+                        ChatSession.id == session_id,
+                        ChatSession.summary_until.is_not_distinct_from(session.summary_until),
+                    )
+                    .values(summary=summary, summary_until=summary_until)
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to update the summary of session %s", session_id)
@@ -0,0 +1,72 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.chat.vector_index import _top_k
+
+# Keeps tickers, line-item codes and figures such as "brk.b" or "1,234.5"
+# as single terms.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.,'&/-][a-z0-9]+)*")
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a document's chunks as an inverted index. Each posting
+    stores its precomputed term weight, so a query is one scatter-add per
+    query term.
+    """
+
+    def __init__(self, texts: Sequence[str], k1: float = BM25_K1, b: float = BM25_B) -> None:
+        self.size = len(texts)
+        counts = [Counter(tokenize(text)) for text in texts]
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.size and lengths.sum() else 1.0
+        length_norm = k1 * (1 - b + b * lengths / avg_length)
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for position, term_counts in enumerate(counts):
+            for term, tf in term_counts.items():
+                positions, tfs = postings.setdefault(term, ([], []))
+                positions.append(position)
+                tfs.append(tf)
+
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (positions, tfs) in postings.items():
+            positions_arr = np.asarray(positions, dtype=np.int32)
+            tf = np.asarray(tfs, dtype=np.float32)
+            idf = math.log(1 + (self.size - len(positions) + 0.5) / (len(positions) + 0.5))
+            weights = idf * tf * (k1 + 1) / (tf + length_norm[positions_arr])
+            self.postings[term] = (positions_arr, weights.astype(np.float32))
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            len(term) + positions.nbytes + weights.nbytes
+            for term, (positions, weights) in self.postings.items()
+        )
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """Returns (position, score) pairs for chunks matching any query term, best first."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                positions, weights = posting
+                scores[positions] += weights
+
+        matched = np.flatnonzero(scores)
+        best = matched[_top_k(scores[matched], top_k)]
+        return [(int(i), float(scores[i])) for i in best]
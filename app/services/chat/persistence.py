@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.metrics import stage_timer
+from app.db.database import AsyncSessionLocal
+from app.services.rag import RAGService
+
+logger = logging.getLogger(__name__)
+
+
+class PendingTurn(NamedTuple):
+    question: str
+    answer: str
+    created_at: datetime
+
+
+class ChatHistoryWriter:
+    """
+    Write-behind persistence for chat_history: finished turns are buffered
+    in memory and inserted in one multi-row INSERT per batch, when
+    batch_size rows are waiting or every flush_interval seconds. A stream
+    only appends to the buffer, so it never waits on a commit. Stopping
+    the writer flushes whatever is left.
+
+    Inserts are idempotent on the row id, so a batch that was committed
+    but not yet dropped from the buffer can safely be written again. A
+    batch that fails on constraints is retried row by row and only the
+    offending rows are dropped; on any other error it stays buffered for
+    the next flush. The buffer holds at most max_pending rows: new chats
+    wait for room, and a turn that still finds it full is inserted on its
+    own.
+
+    Buffered turns are only visible to this process (see pending_turns):
+    with several workers, another worker sees a turn once it is flushed,
+    at most flush_interval later.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._flush_lock = asyncio.Lock()
+        self._direct_writes: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Turns buffered and not yet committed."""
+        return len(self._buffer)
+
+    def submit(
+        self,
+        session_id: UUID,
+        question: str,
+        answer: str,
+        sources: List[str],
+        document_id: Optional[UUID] = None,
+        sources_hash: Optional[str] = None,
+        question_embedding: Optional[np.ndarray] = None,
+    ) -> UUID:
+        """Buffers a finished turn. Never awaits, so it is safe in a finally block."""
+        record_id = uuid.uuid4()
+        row = {
+            "id": record_id,
+            "session_id": session_id,
+            "document_id": document_id,
+            "question": question,
+            "answer": answer,
+            "sources": sources,
+            "sources_hash": sources_hash,
+            "question_embedding": (
+                np.asarray(question_embedding, dtype=np.float32).tobytes()
+                if question_embedding is not None else None
+            ),
+            # Stamped when the turn ends, not when its batch is written, so
+            # turns keep their order (created_at is naive UTC).
+            "created_at": datetime.now(timezone.utc).replace(tzinfo=None),
+        }
+        if len(self._buffer) >= self.max_pending:
+            task = asyncio.create_task(self._write_rows([row]))
+            self._direct_writes.add(task)
+            task.add_done_callback(self._direct_writes.discard)
+            return record_id
+
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return record_id
+
+    async def wait_for_capacity(self) -> None:
+        """Backpressure for new chats while the buffer is full."""
+        while len(self._buffer) >= self.max_pending and self._task is not None:
+            self._drained.clear()
+            self._wakeup.set()
+            await self._drained.wait()
+
+    def pending_turns(self, session_id: UUID) -> List[PendingTurn]:
+        """A session's buffered turns, oldest first."""
+        return [
+            PendingTurn(row["question"], row["answer"], row["created_at"])
+            for row in self._buffer
+            if row["session_id"] == session_id
+        ]
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="chat-history-writer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Let an in-flight flush finish rather than cancelling it mid-commit.
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._direct_writes:
+            await asyncio.gather(*self._direct_writes, return_exceptions=True)
+        if self._buffer:
+            logger.error("Dropping %d chat turns that could not be persisted", len(self._buffer))
+            self._buffer = []
+        self._drained.set()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            try:
+                while self._buffer:
+                    batch = self._buffer[: self.batch_size]
+                    if not await self._write_batch(batch):
+                        return
+                    del self._buffer[: len(batch)]
+            finally:
+                if len(self._buffer) < self.max_pending:
+                    self._drained.set()
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        """False when the batch should stay buffered and be retried."""
+        try:
+            with stage_timer("chat", "persist_flush"):
+                async with AsyncSessionLocal() as db:
+                    await RAGService.insert_chat_entries(db, batch)
+            return True
+        except IntegrityError:
+            # E.g. a turn whose session was deleted meanwhile: write the
+            # others and drop only the rows that can never be inserted.
+            for row in batch:
+                await self._write_rows([row])
+            return True
+        except Exception:
+            logger.exception("Failed to persist %d chat turns; will retry", len(batch))
+            return False
+
+    async def _write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await RAGService.insert_chat_entries(db, rows)
+        except IntegrityError as exc:
+            logger.warning(
+                "Dropping chat turn %s of session %s: %s",
+                rows[0]["id"], rows[0]["session_id"], exc.orig,
+            )
+        except Exception:
+            logger.exception("Failed to persist chat turn %s", rows[0]["id"])
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+chat_history_writer = ChatHistoryWriter(
+    batch_size=settings.chat_persist_batch_size,
+    flush_interval=settings.chat_persist_flush_interval,
+    max_pending=settings.chat_persist_max_pending,
+)
@@ -0,0 +1,277 @@
+import heapq
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.cache.lru import document_index_cache
+from app.services.chat.embedding_codec import decode_embeddings
+from app.services.chat.lexical_index import BM25Index
+from app.services.chat.vector_index import DocumentIndex, build_vector_index
+from app.services.rag import RAGService
+
+
+@dataclass
+class ChunkHit:
+    document_id: UUID
+    ordinal: int
+    page_number: Optional[int]
+    text: str
+    score: float
+    start_char: Optional[int] = None
+    end_char: Optional[int] = None
+
+
+class RetrievalService:
+    """
+    Top-k chunk search over one document, a set of documents or the whole
+    corpus. With the pgvector backend this is one query against the global
+    HNSW index; in memory, each document's cached index is searched and
+    the per-document results are merged with a heap. Sets of documents
+    whose indexes would not fit the cache fall back to the pgvector path.
+
+    With hybrid retrieval, a lexical ranking (BM25 in memory, tsvector
+    full-text search in Postgres) is fused with the dense one by
+    reciprocal rank fusion.
+    """
+
+    @staticmethod
+    async def get_document_index(db: AsyncSession, document) -> DocumentIndex:
+        key = (document.id, document.content_hash)
+        cached = document_index_cache.get(key)
+        if cached is not None:
+            return cached
+
+        payload = await RAGService.get_search_payload(db=db, document_id=document.id)
+        return await RetrievalService._cache_index(document, payload)
+
+    @staticmethod
+    async def get_document_indexes(db: AsyncSession, documents: Sequence) -> List[DocumentIndex]:
+        """
+        Cache misses are loaded memory_search_load_batch documents per
+        query, so no single round trip pulls in an unbounded payload.
+        """
+        indexes = {}
+        missing = []
+        for document in documents:
+            cached = document_index_cache.get((document.id, document.content_hash))
+            if cached is None:
+                missing.append(document)
+            else:
+                indexes[document.id] = cached
+
+        batch_size = max(settings.memory_search_load_batch, 1)
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i: i + batch_size]
+            payloads = {
+                payload.id: payload
+                for payload in await RAGService.get_search_payloads(
+                    db=db, document_ids=[document.id for document in batch]
+                )
+            }
+            for document in batch:
+                if document.id in payloads:
+                    indexes[document.id] = await RetrievalService._cache_index(
+                        document, payloads[document.id]
+                    )
+
+        return [indexes[document.id] for document in documents if document.id in indexes]
+
+    @staticmethod
+    def fits_index_cache(documents: Sequence) -> bool:
+        """
+        Whether the documents' in-memory indexes fit the document cache
+        together. A larger set would evict its own indexes while it is
+        being searched and be reloaded on every query.
+        """
+        if len(documents) <= 1:
+            return True
+        # Rough size of one chunk's index entry: its float32 vector plus
+        # its text and BM25 postings.
+        chunk_bytes = settings.embedding_dim * 4 + settings.chunk_max_tokens * 8
+        total_chunks = sum(getattr(document, "chunk_count", None) or 0 for document in documents)
+        return total_chunks * chunk_bytes <= document_index_cache.max_bytes
+
+    @staticmethod
+    async def _cache_index(document, payload) -> DocumentIndex:
+        if payload.embeddings:
+            embeddings = decode_embeddings(
+                payload.embeddings,
+                dim=payload.embedding_dim,
+                dtype=payload.embedding_dtype,
+            )
+        else:
+            embeddings = np.empty((0, settings.embedding_dim), dtype=np.float32)
+
+        chunks = payload.chunks or []
+        index = await run_in_threadpool(build_vector_index, embeddings)
+        lexical = await run_in_threadpool(BM25Index, chunks) if settings.hybrid_retrieval else None
+        return document_index_cache.put(
+            (document.id, document.content_hash),
+            DocumentIndex(
+                document_id=document.id,
+                chunks=chunks,
+                chunk_spans=payload.chunk_spans or [],
+                index=index,
+                lexical=lexical,
+            ),
+        )
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        question: str,
+        question_embedding: np.ndarray,
+        document_ids: Optional[List[UUID]] = None,
+        top_k: int = 5,
+        documents: Optional[Sequence] = None,
+    ) -> List[ChunkHit]:
+        """
+        document_ids=None searches every ready document. Callers that
+        already hold the documents' (id, content_hash) rows pass them as
+        documents to skip that lookup in memory mode.
+
+        In memory mode, a document set too large for the index cache is
+        searched through the pgvector index instead.
+        """
+        hybrid = settings.hybrid_retrieval
+        n_candidates = max(top_k, settings.hybrid_candidates) if hybrid else top_k
+
+        use_pgvector = settings.retrieval_backend == "pgvector"
+        if not use_pgvector:
+            if documents is None:
+                documents = await RAGService.get_ready_documents(db=db, document_ids=document_ids)
+            if not documents:
+                return []
+            use_pgvector = not RetrievalService.fits_index_cache(documents)
+
+        if use_pgvector:
+            dense = [
+                RetrievalService._to_hit(row)
+                for row in await RAGService.search_chunks(
+                    db=db,
+                    query_embedding=question_embedding,
+                    top_k=n_candidates,
+                    document_ids=document_ids,
+                )
+            ]
+            if not hybrid:
+                return dense
+            lexical = [
+                RetrievalService._to_hit(row)
+                for row in await RAGService.search_chunks_lexical(
+                    db=db,
+                    question=question,
+                    top_k=n_candidates,
+                    document_ids=document_ids,
+                )
+            ]
+            return RetrievalService.fuse([dense, lexical], top_k)
+
+        indexes = await RetrievalService.get_document_indexes(db, documents)
+        return await run_in_threadpool(
+            RetrievalService._search_indexes,
+            indexes,
+            question,
+            question_embedding,
+            top_k,
+            n_candidates,
+            hybrid,
+        )
+
+    @staticmethod
+    def _search_indexes(
+        indexes: Sequence[DocumentIndex],
+        question: str,
+        question_embedding: np.ndarray,
+        top_k: int,
+        n_candidates: int,
+        hybrid: bool,
+    ) -> List[ChunkHit]:
+        dense = RetrievalService.merge_top_k(
+            indexes,
+            lambda document_index, k: document_index.index.search(question_embedding, k),
+            n_candidates,
+        )
+        if not hybrid:
+            return dense
+        lexical = RetrievalService.merge_top_k(
+            [document_index for document_index in indexes if document_index.lexical is not None],
+            lambda document_index, k: document_index.lexical.search(question, k),
+            n_candidates,
+        )
+        return RetrievalService.fuse([dense, lexical], top_k)
+
+    @staticmethod
+    def fuse(rankings: Sequence[List[ChunkHit]], top_k: int) -> List[ChunkHit]:
+        """
+        Reciprocal rank fusion: each chunk scores sum(1 / (rrf_k + rank))
+        over the rankings it appears in, so dense and lexical scores never
+        have to be put on the same scale.
+        """
+        fused: Dict[Tuple[UUID, int], ChunkHit] = {}
+        scores: Dict[Tuple[UUID, int], float] = {}
+        for ranking in rankings:
+            for rank, hit in enumerate(ranking, start=1):
+                key = (hit.document_id, hit.ordinal)
+                fused.setdefault(key, hit)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (settings.rrf_k + rank)
+
+        best = heapq.nlargest(top_k, scores, key=scores.__getitem__)
+        return [replace(fused[key], score=scores[key]) for key in best]
+
+    @staticmethod
+    def merge_top_k(
+        indexes: Sequence[DocumentIndex],
+        search: Callable[[DocumentIndex, int], List[Tuple[int, float]]],
+        top_k: int,
+    ) -> List[ChunkHit]:
+        """
+        Each index contributes at most top_k candidates, so the merge keeps
+        a heap of top_k entries instead of scoring one concatenated matrix.
+        """
+        heap: List[tuple] = []
+        for document_index in indexes:
+            if len(document_index.index) == 0:
+                continue
+            for ordinal, score in search(document_index, top_k):
+                if len(heap) == top_k and score <= heap[0][0]:
+                    break
+                entry = (score, str(document_index.document_id), ordinal, document_index)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                else:
+                    heapq.heapreplace(heap, entry)
+
+        hits = []
+        for score, _, ordinal, document_index in sorted(heap, key=lambda e: e[0], reverse=True):
+            spans = document_index.chunk_spans
+            page, start, end = spans[ordinal] if ordinal < len(spans) else (None, None, None)
+            hits.append(
+                ChunkHit(
+                    document_id=document_index.document_id,
+                    ordinal=ordinal,
+                    page_number=page,
+                    text=document_index.chunks[ordinal],
+                    score=float(score),
+                    start_char=start,
+                    end_char=end,
+                )
+            )
+        return hits
+
+    @staticmethod
+    def _to_hit(row) -> ChunkHit:
+        return ChunkHit(
+            document_id=row.document_id,
+            ordinal=row.ordinal,
+            page_number=row.page_number,
+            text=row.text,
+            score=float(row.score),
+            start_char=row.start_char,
+            end_char=row.end_char,
+        )
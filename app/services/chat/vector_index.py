@@ -0,0 +1,141 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.services.chat.lexical_index import BM25Index
+
+
+def _normalize(vectors) -> np.ndarray:
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+class VectorIndex(ABC):
+    """Cosine-similarity top-k search over a fixed set of vectors."""
+
+    matrix: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+    @abstractmethod
+    def search(self, query, top_k: int) -> List[Tuple[int, float]]:
+        """Returns (position, score) pairs, best first."""
+
+
+class ExactVectorIndex(VectorIndex):
+    """Brute force over a pre-normalized float32 matrix: one matvec per query."""
+
+    def __init__(self, vectors) -> None:
+        self.matrix = _normalize(vectors)
+
+    def search(self, query, top_k: int) -> List[Tuple[int, float]]:
+        q = _normalize(query)[0]
+        scores = self.matrix @ q
+        return [(int(i), float(scores[i])) for i in _top_k(scores, top_k)]
+
+
+class IVFVectorIndex(VectorIndex):
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means
+    centroid and a query only scores the buckets of its n_probe closest
+    centroids.
+    """
+
+    def __init__(
+        self,
+        vectors,
+        n_lists: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        seed: int = 0,
+    ) -> None:
+        from sklearn.cluster import MiniBatchKMeans
+
+        matrix = _normalize(vectors)
+        n_lists = min(n_lists or max(1, int(np.sqrt(len(matrix)))), len(matrix))
+        self.n_probe = min(n_probe or settings.ivf_n_probe, n_lists)
+
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_lists,
+            random_state=seed,
+            n_init=1,
+            batch_size=min(len(matrix), 4096),
+        ).fit(matrix)
+        labels = kmeans.labels_
+
+        order = np.argsort(labels, kind="stable")
+        self.ids = order
+        self.offsets = np.searchsorted(labels[order], np.arange(n_lists + 1))
+        self.centroids = _normalize(kmeans.cluster_centers_)
+        # Rows are stored grouped by list so each probed bucket is one slice.
+        self.matrix = matrix[order]
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.centroids.nbytes + self.ids.nbytes
+
+    def search(self, query, top_k: int) -> List[Tuple[int, float]]:
+        q = _normalize(query)[0]
+        probes = _top_k(self.centroids @ q, self.n_probe)
+        slices = [slice(self.offsets[p], self.offsets[p + 1]) for p in probes]
+
+        candidates = np.concatenate([self.ids[s] for s in slices])
+        scores = np.concatenate([self.matrix[s] @ q for s in slices])
+        return [
+            (int(candidates[i]), float(scores[i]))
+            for i in _top_k(scores, top_k)
+        ]
+
+
+def build_vector_index(vectors, backend: Optional[str] = None) -> VectorIndex:
+    backend = backend or settings.vector_index_backend
+    if backend == "ivf" and len(vectors) >= settings.ivf_min_vectors:
+        return IVFVectorIndex(vectors)
+    if backend not in ("exact", "ivf"):
+        raise ValueError(f"Unknown vector index backend: {backend}")
+    return ExactVectorIndex(vectors)
+
+
+@dataclass
+class DocumentIndex:
+    """
+    A document's chunks with the search index built over their embeddings
+    and, for hybrid retrieval, a BM25 index over their text.
+    """
+
+    document_id: UUID
+    chunks: List[str]
+    chunk_spans: List[List[int]]
+    index: VectorIndex
+    lexical: Optional["BM25Index"] = None
+
+    @property
+    def nbytes(self) -> int:
+        lexical_bytes = self.lexical.nbytes if self.lexical is not None else 0
+        return self.index.nbytes + lexical_bytes + sum(len(chunk) for chunk in self.chunks)
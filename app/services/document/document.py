@@ -1,76 +1,144 @@
+import re
 import uuid
 import hashlib
 import aiofiles
 import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException, UploadFile
-from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from pypdf import PdfReader
 
-from app.models.document_record import DocumentRecord
-from app.schemas.document import DocumentCreate, DocumentRead, DocumentSchema
+from app.core.config import settings
+from app.core.metrics import stage_timer
+from app.models.document_record import DocumentRecord, DocumentStatus
+from app.services.chat.document_processor import DocumentProcessor
+from app.services.pagination import paginate
 
 UPLOAD_DIR = Path("app/storage")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+PAGE_SEPARATOR = "\n\n"
 
 
 class DocumentService:
 
     @staticmethod
-    async def get_file_hash(file: UploadFile) -> str:
+    async def _spool_upload(file: UploadFile) -> Tuple[Path, str]:
+        """
+        Single pass over the upload: hashes, size-checks and writes it to a
+        temp file inside UPLOAD_DIR, so only one chunk is in memory at a time.
+        """
+        max_bytes = settings.max_upload_size_mb * 1024 * 1024
+        if file.size is not None and file.size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds the {settings.max_upload_size_mb} MB upload limit.",
+            )
+
         hasher = hashlib.md5()
-        await file.seek(0)
-        while chunk := await file.read(64 * 1024):
-            hasher.update(chunk)
-        await file.seek(0)
-        return hasher.hexdigest()
+        size = 0
+        tmp_path = UPLOAD_DIR / f".upload-{uuid.uuid4().hex}.part"
+        try:
+            await file.seek(0)
+            async with aiofiles.open(tmp_path, "wb") as buffer:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File exceeds the {settings.max_upload_size_mb} MB upload limit.",
+                        )
+                    hasher.update(chunk)
+                    await buffer.write(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return tmp_path, hasher.hexdigest()
 
     @staticmethod
-    def _sync_extract_text(file_path: str) -> str:
-        """Isolated sync worker for CPU-bound PDF parsing."""
-        try:
-            reader = PdfReader(file_path)
-            return "\n".join([p.extract_text() for p in reader.pages if p.extract_text()])
-        except Exception as e:
-            raise ValueError(f"Internal PDF parsing error: {str(e)}")
+    def normalize_text(text: str) -> str:
+        """Canonical form of extracted text; content_hash is computed over this."""
+        text = text.replace("\x00", "").replace("\r\n", "\n").replace("\r", "\n")
+        text = re.sub(r"[ \t\f\v]+", " ", text)
+        text = re.sub(r" *\n *", "\n", text)
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        return text.strip()
 
     @staticmethod
-    async def upload_file(file: UploadFile, db: AsyncSession):
-        file_hash = await DocumentService.get_file_hash(file)
+    def content_hash(content: str) -> str:
+        return hashlib.md5(content.encode("utf-8")).hexdigest()
 
-        existing = await db.execute(select(DocumentRecord).where(DocumentRecord.file_hash == file_hash))
-        if duplicate := existing.scalar_one_or_none():
-            return duplicate
+    @staticmethod
+    def join_pages(pages: List[str]) -> Tuple[str, List[int]]:
+        """
+        Normalizes each page and joins them into one text. Returns the text
+        and the character offset at which each page starts.
+        """
+        parts: List[str] = []
+        page_offsets: List[int] = []
+        length = 0
+        for page in pages:
+            text = DocumentService.normalize_text(page)
+            if text and parts:
+                length += len(PAGE_SEPARATOR)
+            page_offsets.append(length)
+            if text:
+                parts.append(text)
+                length += len(text)
+        return PAGE_SEPARATOR.join(parts), page_offsets
+
+    @staticmethod
+    async def upload_file(file: UploadFile, db: AsyncSession):
+        with stage_timer("upload", "spool"):
+            tmp_path, file_hash = await DocumentService._spool_upload(file)
 
         file_id = uuid.uuid4()
         extension = Path(file.filename).suffix if file.filename else ".pdf"
         dest_path = UPLOAD_DIR / f"{file_id}{extension}"
 
         try:
-            content = await file.read()
-            async with aiofiles.open(dest_path, "wb") as buffer:
-                await buffer.write(content)
-
-            extracted_text = await run_in_threadpool(DocumentService._sync_extract_text, str(dest_path))
-
-            new_file = DocumentRecord(
-                id=file_id,
-                file_name=file.filename,
-                file_path=str(dest_path),
-                file_hash=file_hash,
-                chunks=[extracted_text] if extracted_text else []
-            )
+            with stage_timer("upload", "dedup_lookup"):
+                existing = await db.execute(select(DocumentRecord).where(DocumentRecord.file_hash == file_hash))
+            if duplicate := existing.scalar_one_or_none():
+                tmp_path.unlink(missing_ok=True)
+                return duplicate
+
+            # Same directory as the temp file, so the rename is atomic.
+            os.replace(tmp_path, dest_path)
+
+            # Concurrent uploads of the same file race on the unique
+            # file_hash: exactly one insert wins and the others return its
+            # row, so the file is only ever ingested once.
+            # Extraction, chunking and embedding run in the ingestion worker.
+            with stage_timer("upload", "insert"):
+                inserted = await db.execute(
+                    pg_insert(DocumentRecord)
+                    .values(
+                        id=file_id,
+                        file_name=file.filename,
+                        file_path=str(dest_path),
+                        file_hash=file_hash,
+                        status=DocumentStatus.PENDING.value,
+                    )
+                    .on_conflict_do_nothing(index_elements=[DocumentRecord.file_hash])
+                    .returning(DocumentRecord.id)
+                )
+                new_id = inserted.scalar_one_or_none()
+                await db.commit()
+
+            if new_id is None:
+                os.remove(dest_path)
+                existing = await db.execute(select(DocumentRecord).where(DocumentRecord.file_hash == file_hash))
+                return existing.scalar_one()
 
-            db.add(new_file)
-            await db.commit()
-            await db.refresh(new_file)
-            return new_file
+            return await db.get(DocumentRecord, new_id)
 
         except Exception as e:
+            tmp_path.unlink(missing_ok=True)
             if dest_path.exists():
                 os.remove(dest_path)
             if isinstance(e, HTTPException):
@@ -88,27 +156,52 @@ class DocumentService:
         return record
 
     @staticmethod
-    async def get_record(file_id: uuid.UUID, db: AsyncSession):
-        result = await db.execute(select(DocumentRecord).where(DocumentRecord.id == file_id))
-        record = result.scalar_one_or_none()
-        if not record:
+    async def get_status(file_id: uuid.UUID, db: AsyncSession):
+        result = await db.execute(
+            select(
+                DocumentRecord.id,
+                DocumentRecord.status,
+                DocumentRecord.error,
+                DocumentRecord.content_hash,
+            )
+            .where(DocumentRecord.id == file_id)
+        )
+        row = result.one_or_none()
+        if not row:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        text_content = ""
+        return row
+
+    @staticmethod
+    async def extract_content(file_path: str) -> Tuple[str, List[int]]:
+        """Parses the file once, off the event loop, into text and page offsets."""
         try:
-            reader = PdfReader(record.file_path)  # type: ignore
-            for page in reader.pages:
-                text_content += page.extract_text() + "\n"
+            pages = await DocumentProcessor.extract_pages(file_path)
         except Exception as e:
-            raise ValueError(f"Could not read PDF: {e}")
-
-        return {
-            "file_name": record.file_name,
-            "content": text_content,
-            "file_path": record.file_path
-        }
+            raise HTTPException(status_code=422, detail=f"Could not read PDF: {e}")
+        return DocumentService.join_pages(pages)
 
     @staticmethod
-    async def get_all_files(db: AsyncSession) -> List[DocumentRecord]:
-        result = await db.execute(select(DocumentRecord))
-        return list(result.scalars().all())
+    async def get_all_files(
+        db: AsyncSession,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List, Optional[str]]:
+        """Newest first; only the precomputed summary columns are read."""
+        stmt = select(
+            DocumentRecord.id,
+            DocumentRecord.file_name,
+            DocumentRecord.status,
+            DocumentRecord.page_count,
+            DocumentRecord.chunk_count,
+            DocumentRecord.created_at,
+        )
+        return await paginate(
+            db,
+            stmt,
+            DocumentRecord.created_at,
+            DocumentRecord.id,
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+        )
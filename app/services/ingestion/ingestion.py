@@ -0,0 +1,143 @@
+import logging
+from datetime import timedelta
+from typing import List, Tuple
+from uuid import UUID
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import undefer
+
+from app.core.config import settings
+from app.core.metrics import stage_timer
+from app.db.database import AsyncSessionLocal
+from app.models.document_record import DocumentRecord, DocumentStatus
+from app.services.cache.backend import get_cache_backend
+from app.services.chat.chunks import ChunkService
+from app.services.document.document import DocumentService
+from app.services.llm.service import get_embedding_backend
+from app.services.rag import RAGService
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionService:
+    """
+    Extracts, chunks and embeds an uploaded document so that chat only
+    ever reads precomputed data.
+    """
+
+    @staticmethod
+    async def ingest_document(document_id: UUID) -> None:
+        """
+        Ingests a document at most once at a time across all worker
+        processes: the job first claims the row with a conditional UPDATE
+        and is skipped when another process already has it. A claim older
+        than ingestion_stale_seconds is treated as abandoned by a process
+        that died mid-ingestion and can be taken over.
+        """
+        if not await IngestionService._claim(document_id):
+            logger.info("Document %s is ready or being ingested by another worker", document_id)
+            return
+        await IngestionService._ingest(document_id)
+
+    @staticmethod
+    async def _claim(document_id: UUID) -> bool:
+        stale_before = func.now() - timedelta(seconds=settings.ingestion_stale_seconds)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(DocumentRecord)
+                .where(
+                    DocumentRecord.id == document_id,
+                    or_(
+                        DocumentRecord.status.in_(
+                            [DocumentStatus.PENDING.value, DocumentStatus.FAILED.value]
+                        ),
+                        and_(
+                            DocumentRecord.status == DocumentStatus.PROCESSING.value,
+                            or_(
+                                DocumentRecord.ingestion_started_at.is_(None),
+                                DocumentRecord.ingestion_started_at < stale_before,
+                            ),
+                        ),
+                    ),
+                )
+                .values(
+                    status=DocumentStatus.PROCESSING.value,
+                    error=None,
+                    ingestion_started_at=func.now(),
+                )
+                .returning(DocumentRecord.id)
+            )
+            claimed = result.scalar_one_or_none() is not None
+            await db.commit()
+        return claimed
+
+    @staticmethod
+    async def _ingest(document_id: UUID) -> None:
+        async with AsyncSessionLocal() as db:
+            document = await db.get(
+                DocumentRecord,
+                document_id,
+                options=[undefer(DocumentRecord.content), undefer(DocumentRecord.page_offsets)],
+            )
+            if document is None:
+                return
+
+            try:
+                if document.page_offsets is None and document.file_path:
+                    with stage_timer("ingest", "extract"):
+                        content, page_offsets = await IngestionService._extract(document)
+                    document.content = content
+                    document.page_offsets = page_offsets
+                    document.page_count = len(page_offsets)
+                    document.content_hash = DocumentService.content_hash(document.content)
+
+                if not document.content:
+                    raise ValueError("Document contains no extractable text.")
+
+                with stage_timer("ingest", "chunk"):
+                    chunks = await run_in_threadpool(
+                        ChunkService.chunk_document, document.content, document.page_offsets
+                    )
+                with stage_timer("ingest", "embed"):
+                    embeddings = np.asarray(
+                        await get_embedding_backend().embed([chunk.text for chunk in chunks]),
+                        dtype=np.float32,
+                    )
+
+                document.status = DocumentStatus.READY.value
+                with stage_timer("ingest", "store"):
+                    await RAGService.store_document_embeddings(
+                        db=db,
+                        document=document,
+                        chunks=chunks,
+                        embeddings=embeddings,
+                    )
+                logger.info("Ingested document %s (%d chunks)", document_id, len(chunks))
+
+            except Exception as exc:
+                logger.exception("Ingestion failed for document %s", document_id)
+                await db.rollback()
+                detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                document = await db.get(DocumentRecord, document_id)
+                if document is not None:
+                    document.status = DocumentStatus.FAILED.value
+                    document.error = str(detail)[: settings.ingestion_error_max_length]
+                    await db.commit()
+
+    @staticmethod
+    async def _extract(document: DocumentRecord) -> Tuple[str, List[int]]:
+        """Extracted text is shared across workers, keyed by the file hash."""
+        shared_cache = get_cache_backend()
+        key = f"extract:{document.file_hash}"
+        cached = await shared_cache.get_object(key)
+        if cached is not None:
+            return cached["content"], cached["page_offsets"]
+
+        content, page_offsets = await DocumentService.extract_content(document.file_path)
+        await shared_cache.set_object(
+            key, {"content": content, "page_offsets": page_offsets}
+        )
+        return content, page_offsets
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.document_record import DocumentRecord, DocumentStatus
+from app.services.ingestion.ingestion import IngestionService
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionWorker:
+    """
+    In-process job queue: a fixed pool of asyncio tasks drains document ids
+    and ingests them. Documents left pending or processing by a previous
+    run are re-enqueued on start.
+
+    Jobs are single-flight per document: enqueueing a document that is
+    already queued or running joins the existing job, and every caller
+    waiting on it is released when that one ingestion finishes.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        self._queue: "asyncio.Queue[UUID]" = asyncio.Queue()
+        self._jobs: Dict[UUID, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def pending(self) -> int:
+        """Documents queued or being ingested."""
+        return len(self._jobs)
+
+    def enqueue(self, document_id: UUID) -> asyncio.Future:
+        job = self._jobs.get(document_id)
+        if job is None:
+            job = asyncio.get_running_loop().create_future()
+            self._jobs[document_id] = job
+            self._queue.put_nowait(document_id)
+        return job
+
+    async def wait(self, document_id: UUID, timeout: float) -> bool:
+        """Waits for this process's in-flight job on the document, if any."""
+        job = self._jobs.get(document_id)
+        if job is None:
+            return False
+        try:
+            await asyncio.wait_for(asyncio.shield(job), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def enqueue_unless_ready(self, document: DocumentRecord) -> None:
+        """Schedules new uploads, and retries failed ones on re-upload."""
+        if document.status != DocumentStatus.READY.value:
+            self.enqueue(document.id)
+
+    async def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"ingestion-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(DocumentRecord.id).where(
+                    DocumentRecord.status.in_(
+                        [DocumentStatus.PENDING.value, DocumentStatus.PROCESSING.value]
+                    )
+                )
+            )
+            for document_id in result.scalars().all():
+                self.enqueue(document_id)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while True:
+            document_id = await self._queue.get()
+            try:
+                await IngestionService.ingest_document(document_id)
+            except Exception:
+                logger.exception("Ingestion worker crashed on document %s", document_id)
+            finally:
+                job = self._jobs.pop(document_id, None)
+                if job is not None and not job.done():
+                    job.set_result(None)
+                self._queue.task_done()
+
+
+ingestion_worker = IngestionWorker(concurrency=settings.ingestion_workers)
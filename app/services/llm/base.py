@@ -0,0 +1,29 @@
+from typing import AsyncIterator, Dict, List, Optional, Protocol
+
+Message = Dict[str, str]
+
+
+class LLMBackend(Protocol):
+    """A chat model: streamed answers and one-shot completions."""
+
+    model: str
+
+    def stream_chat(self, messages: List[Message], temperature: float = 0) -> AsyncIterator[str]:
+        ...
+
+    async def complete(
+        self,
+        messages: List[Message],
+        temperature: float = 0,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        ...
+
+
+class EmbeddingBackend(Protocol):
+    """An embedding model; vectors are returned in input order."""
+
+    model: str
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        ...
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import random
+from typing import List, Optional
+
+import openai
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.services.llm.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,
+)
+
+
+class EmbeddingPipeline:
+    """
+    Embeds an arbitrary number of texts by splitting them into token-bounded
+    batches, running up to `concurrency` requests at once across all callers
+    and retrying 429/5xx/connection failures with exponential backoff.
+    Results are returned in input order.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        max_batch_tokens: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+    ) -> None:
+        # Retries are handled here, so the client must not retry on its own.
+        self.client = client.with_options(max_retries=0)
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens or settings.embedding_batch_max_tokens
+        self.max_batch_size = max_batch_size or settings.embedding_batch_max_size
+        self.concurrency = concurrency or settings.embedding_concurrency
+        # Shared by every embed() call, so concurrent ingestions together
+        # stay within the provider's request budget.
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.max_retries = (
+            settings.embedding_max_retries if max_retries is None else max_retries
+        )
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Groups text positions into batches under both the token and size caps."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = count_tokens(text)
+            if current and (
+                current_tokens + tokens > self.max_batch_tokens
+                or len(current) >= self.max_batch_size
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        async def run(batch: List[int]) -> None:
+            async with self._semaphore:
+                vectors = await self._embed_with_retry([texts[i] for i in batch])
+            for i, vector in zip(batch, vectors):
+                results[i] = vector
+
+        await asyncio.gather(*(run(batch) for batch in self.make_batches(texts)))
+        return results  # type: ignore[return-value]
+
+    async def _embed_with_retry(self, batch: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.embeddings.create(
+                    model=self.model,
+                    input=batch,
+                )
+                # The API tags each vector with its input position.
+                ordered = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in ordered]
+            except RETRYABLE_ERRORS as exc:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(exc, attempt)
+                logger.warning(
+                    "Embedding batch of %d failed (%s), retrying in %.2fs",
+                    len(batch), type(exc).__name__, delay,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    @staticmethod
+    def _retry_delay(exc: Exception, attempt: int) -> float:
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), settings.embedding_backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps concurrent batches from retrying in lockstep.
+        ceiling = min(
+            settings.embedding_backoff_max,
+            settings.embedding_backoff_base * 2 ** attempt,
+        )
+        return random.uniform(0, ceiling)
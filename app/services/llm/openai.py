@@ -1,48 +1,95 @@
-import os
-from openai import OpenAI
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional
 
-from app.services.rag import RAGService
+import httpx
+from openai import AsyncOpenAI
 
+from app.core.config import settings
+from app.services.llm.base import Message
 
-class OpenAIService:
-    def __init__(self, api_key: Optional[str], model: str = "gpt-4o"):
-        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OpenAI API Key is missing.")
+# "openai" is the OpenAI API; "openai_compatible" a self-hosted server
+# speaking the same protocol (vLLM, llama.cpp, Ollama, ...).
+PROVIDERS = ("openai", "openai_compatible")
 
-        self.client = OpenAI(api_key=self.api_key)
-        self.model = model
-        self.embedding_model = "text-embedding-3-small"
+_clients: Dict[str, AsyncOpenAI] = {}
+
+
+def init_openai_client(provider: str = "openai") -> AsyncOpenAI:
+    """
+    Creates the process-wide AsyncOpenAI client for a provider. All
+    requests share its HTTP connection pool so TCP/TLS sessions are reused
+    across requests.
+    """
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown OpenAI provider: {provider}")
+
+    if provider not in _clients:
+        if provider == "openai":
+            if not settings.OPENAI_API_KEY:
+                raise ValueError("OpenAI API Key is missing.")
+            api_key, base_url = settings.OPENAI_API_KEY, settings.openai_base_url
+        else:
+            if not settings.compatible_base_url:
+                raise ValueError("compatible_base_url is missing.")
+            api_key, base_url = settings.compatible_api_key, settings.compatible_base_url
 
-    def get_embeddings(self, text_chunks: list[str]):
-        response = self.client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text_chunks
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections,
+                keepalive_expiry=settings.openai_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(settings.openai_timeout, connect=5.0),
         )
-        return [item.embedding for item in response.data]
-
-    async def ask_question_about_document(self, db, session_id, sources, context_text, user_question):
-        system_prompt = """
-        You are a helpful assistant. Use ONLY the provided context to answer the question. 
-        If the answer is not in the context, say you don't know. 
-        Context:
-        {context}
-        """.format(context=context_text)
-
-        full_answer = ""
-        user_prompt = f"Question: {user_question}"
-        stream = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0,
+        _clients[provider] = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=settings.openai_max_retries,
+            http_client=http_client,
+        )
+    return _clients[provider]
+
+
+def get_openai_client(provider: str = "openai") -> AsyncOpenAI:
+    return _clients.get(provider) or init_openai_client(provider)
+
+
+async def close_openai_clients() -> None:
+    for client in _clients.values():
+        await client.close()
+    _clients.clear()
+
+
+class OpenAIChatBackend:
+    """LLMBackend over the chat completions API, for OpenAI or a compatible server."""
+
+    def __init__(self, client: AsyncOpenAI, model: str) -> None:
+        self.client = client
+        self.model = model
+
+    async def stream_chat(self, messages: List[Message], temperature: float = 0) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
             stream=True
         )
-        for chunk in stream:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
             content = chunk.choices[0].delta.content
             if content:
-                full_answer += content
                 yield content
+
+    async def complete(
+        self,
+        messages: List[Message],
+        temperature: float = 0,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content or ""
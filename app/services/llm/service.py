@@ -0,0 +1,124 @@
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.llm.base import EmbeddingBackend, LLMBackend
+from app.services.llm.embedding_pipeline import EmbeddingPipeline
+from app.services.llm.openai import (
+    PROVIDERS,
+    OpenAIChatBackend,
+    close_openai_clients,
+    get_openai_client,
+    init_openai_client,
+)
+from app.services.llm.stub import StubChatBackend, StubEmbeddingBackend
+
+
+def get_llm_backend(model: Optional[str] = None, backend: Optional[str] = None) -> LLMBackend:
+    backend = backend or settings.llm_backend
+    model = model or settings.chat_model
+    if backend in PROVIDERS:
+        return OpenAIChatBackend(get_openai_client(backend), model)
+    if backend == "stub":
+        return StubChatBackend()
+    raise ValueError(f"Unknown LLM backend: {backend}")
+
+
+# One pipeline per provider: it wraps the shared client and its concurrency
+# limit applies across requests.
+_embedding_pipelines: Dict[str, EmbeddingPipeline] = {}
+
+
+def get_embedding_backend(backend: Optional[str] = None) -> EmbeddingBackend:
+    backend = backend or settings.embedding_backend
+    if backend in PROVIDERS:
+        pipeline = _embedding_pipelines.get(backend)
+        if pipeline is None:
+            pipeline = EmbeddingPipeline(get_openai_client(backend), settings.embedding_model)
+            _embedding_pipelines[backend] = pipeline
+        return pipeline
+    if backend == "stub":
+        return StubEmbeddingBackend()
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def init_llm_backends() -> None:
+    """Opens the connection pools of the configured remote backends."""
+    for backend in {settings.llm_backend, settings.embedding_backend}:
+        if backend in PROVIDERS:
+            init_openai_client(backend)
+    get_embedding_backend()
+
+
+async def close_llm_backends() -> None:
+    _embedding_pipelines.clear()
+    await close_openai_clients()
+
+
+class LLMService:
+    """
+    The prompts of the RAG pipeline, independent of the model provider.
+    Summaries can use a cheaper model than answers (summary_model).
+    """
+
+    def __init__(
+        self,
+        llm: LLMBackend,
+        embeddings: EmbeddingBackend,
+        summary_llm: Optional[LLMBackend] = None,
+    ) -> None:
+        self.llm = llm
+        self.embeddings = embeddings
+        self.summary_llm = summary_llm or llm
+
+    @property
+    def embedding_model(self) -> str:
+        return self.embeddings.model
+
+    async def get_embeddings(self, text_chunks: List[str]):
+        return await self.embeddings.embed(text_chunks)
+
+    def ask_question_about_document(
+        self, session_id, sources, context_text, user_question, history=None
+    ) -> AsyncIterator[str]:
+        system_prompt = """
+        You are a helpful assistant. Use ONLY the provided context to answer the question. 
+        If the answer is not in the context, say you don't know. 
+        Context:
+        {context}
+        """.format(context=context_text)
+
+        user_prompt = f"Question: {user_question}"
+        return self.llm.stream_chat(
+            [
+                {"role": "system", "content": system_prompt},
+                *(history or []),
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0,
+        )
+
+    async def summarize_conversation(self, previous_summary, turns) -> str:
+        transcript = "\n\n".join(
+            f"User: {question}\nAssistant: {answer}" for question, answer in turns
+        )
+        prompt = (
+            "Update the summary of this conversation about a document. Keep the "
+            "facts, figures and open questions a follow-up question could refer to.\n\n"
+            f"Current summary:\n{previous_summary or '(none)'}\n\n"
+            f"New turns:\n{transcript}"
+        )
+        summary = await self.summary_llm.complete(
+            [{"role": "user", "content": prompt}],
+            temperature=0,
+            max_tokens=settings.history_summary_max_tokens,
+        )
+        return summary or previous_summary or ""
+
+
+def get_llm_service() -> LLMService:
+    summary_llm = get_llm_backend(settings.summary_model) if settings.summary_model else None
+    return LLMService(
+        llm=get_llm_backend(),
+        embeddings=get_embedding_backend(),
+        summary_llm=summary_llm,
+    )
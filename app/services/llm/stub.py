@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import re
+from typing import AsyncIterator, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.llm.base import Message
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class StubEmbeddingBackend:
+    """
+    Deterministic offline embeddings: signed feature hashing of the lower-
+    cased words, so texts sharing words are close and the same text always
+    maps to the same unit vector.
+    """
+
+    def __init__(self, model: str = "stub-embedding", dim: Optional[int] = None) -> None:
+        self.model = model
+        self.dim = dim or settings.embedding_dim
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = _WORD_RE.findall(text.lower()) or [text]
+        for word in words:
+            h = _hash(word)
+            vector[h % self.dim] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if settings.stub_embedding_latency_ms:
+            await asyncio.sleep(settings.stub_embedding_latency_ms / 1000)
+        return [self.embed_one(text) for text in texts]
+
+
+class StubChatBackend:
+    """
+    Deterministic offline chat model for load tests and benchmarks: streams
+    a canned answer derived from the last user message, with configurable
+    time to first token and inter-token latency.
+    """
+
+    def __init__(self, model: str = "stub-chat") -> None:
+        self.model = model
+
+    @staticmethod
+    def _answer_tokens(messages: List[Message], n_tokens: int) -> List[str]:
+        question = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+        )
+        words = _WORD_RE.findall(question) or ["stub"]
+        seed = _hash(question)
+        return [
+            words[(seed + i) % len(words)] + " " for i in range(n_tokens)
+        ]
+
+    async def stream_chat(self, messages: List[Message], temperature: float = 0) -> AsyncIterator[str]:
+        await asyncio.sleep(settings.stub_first_token_latency_ms / 1000)
+        for i, token in enumerate(self._answer_tokens(messages, settings.stub_answer_tokens)):
+            if i and settings.stub_token_latency_ms:
+                await asyncio.sleep(settings.stub_token_latency_ms / 1000)
+            yield token
+
+    async def complete(
+        self,
+        messages: List[Message],
+        temperature: float = 0,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        n_tokens = min(settings.stub_answer_tokens, max_tokens or settings.stub_answer_tokens)
+        await asyncio.sleep(
+            (settings.stub_first_token_latency_ms + n_tokens * settings.stub_token_latency_ms) / 1000
+        )
+        return "".join(self._answer_tokens(messages, n_tokens)).strip()
@@ -0,0 +1,44 @@
+import math
+import re
+from typing import Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to an offline estimate
+    tiktoken = None
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_encoder = None
+_encoder_loaded = False
+
+
+def _get_encoder():
+    """cl100k_base when tiktoken and its BPE file are available, else None."""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoder = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoder = None
+    return _encoder
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Offline approximation of cl100k_base: one token per punctuation mark
+    and roughly one per four characters of each word. Errs on the high side.
+    """
+    return sum(
+        max(1, math.ceil(len(piece) / 4)) for piece in _PIECE_RE.findall(text)
+    )
+
+
+def count_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
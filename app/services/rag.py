@@ -1,100 +1,297 @@
+from typing import Optional
 from uuid import UUID
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.models.document_record import DocumentRecord
+from sqlalchemy import cast, delete, insert, select, func, text
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert as pg_insert
+from sqlalchemy.orm import defer
+from app.models.document_chunk import DocumentChunk
+from app.models.document_record import DocumentRecord, DocumentStatus
 from app.models.chat_record import ChatRecord
+from app.core.config import settings
+from app.services.chat.chunks import Chunk
+from app.services.chat.embedding_codec import encode_embeddings
+from app.services.pagination import paginate
 import uuid
 
 
 class RAGService:
     @staticmethod
-    async def create_document_entry(
+    async def store_document_embeddings(
         db: AsyncSession,
-        file_name: str,
-        file_hash: str,
-        chunks: list[str],
-        embeddings: list[list[float]]
-    ):
-        """Creates a document record with cached embeddings to save OpenAI costs."""
-        new_document = DocumentRecord(
-            id=uuid.uuid4(),
-            file_name=file_name,
-            file_hash=file_hash,
-            chunks=chunks,
-            embeddings=embeddings,
-            created_at=func.now()
+        document: DocumentRecord,
+        chunks: list[Chunk],
+        embeddings: np.ndarray
+    ) -> DocumentRecord:
+        """
+        Caches chunks and packed embeddings on the document row to save OpenAI
+        costs, and mirrors them into document_chunks for server-side search.
+        """
+        dtype = settings.embedding_storage_dtype
+        document.chunks = [chunk.text for chunk in chunks]
+        document.chunk_spans = [[chunk.page, chunk.start, chunk.end] for chunk in chunks]
+        document.embeddings = encode_embeddings(embeddings, dtype=dtype)
+        document.embedding_dim = embeddings.shape[1]
+        document.embedding_dtype = dtype
+        document.chunk_count = len(chunks)
+
+        await db.execute(
+            delete(DocumentChunk).where(DocumentChunk.document_id == document.id)
         )
-        db.add(new_document)
+        if chunks:
+            await db.execute(
+                insert(DocumentChunk),
+                [
+                    {
+                        "document_id": document.id,
+                        "ordinal": ordinal,
+                        "page_number": chunk.page,
+                        "start_char": chunk.start,
+                        "end_char": chunk.end,
+                        "text": chunk.text,
+                        "embedding": embedding,
+                    }
+                    for ordinal, (chunk, embedding) in enumerate(zip(chunks, embeddings))
+                ],
+            )
         await db.commit()
-        await db.refresh(new_document)
-        return new_document
+        return document
 
     @staticmethod
-    async def create_chat_entry(
+    async def find_cached_answer(
         db: AsyncSession,
-        session_id: UUID,
-        query: str,
-        answer: str,
-        sources: list[str]
-    ):
-        new_chat = ChatRecord(
-            id=uuid.uuid4(),
-            session_id=session_id,
-            question=query,
-            answer=answer,
-            sources=sources,
-            created_at=func.now()
+        document_id: UUID,
+        sources_hash: str,
+        question_embedding: np.ndarray,
+    ) -> Optional[str]:
+        """
+        Returns a previous answer given for the same document and the same
+        retrieved chunks to a question whose embedding is within the
+        configured cosine similarity, if any.
+        """
+        result = await db.execute(
+            select(ChatRecord.answer, ChatRecord.question_embedding)
+            .where(
+                ChatRecord.document_id == document_id,
+                ChatRecord.sources_hash == sources_hash,
+                ChatRecord.question_embedding.is_not(None),
+            )
+            .order_by(ChatRecord.created_at.desc())
+            .limit(settings.answer_cache_candidates)
         )
+        rows = result.all()
+        if not rows:
+            return None
 
-        db.add(new_chat)
+        query = np.asarray(question_embedding, dtype=np.float32)
+        candidates = np.stack([
+            np.frombuffer(row.question_embedding, dtype=np.float32) for row in rows
+        ])
+        similarities = candidates @ query / (
+            np.linalg.norm(candidates, axis=1) * np.linalg.norm(query) + 1e-12
+        )
+        best = int(np.argmax(similarities))
+        if similarities[best] >= settings.answer_cache_similarity:
+            return rows[best].answer
+        return None
+
+    @staticmethod
+    async def insert_chat_entries(db: AsyncSession, rows: list[dict]) -> None:
+        """
+        One multi-row INSERT for a batch of finished turns; nothing is read
+        back. Rows whose id already exists are skipped, so a batch can be
+        written again safely.
+        """
+        if not rows:
+            return
+        await db.execute(
+            pg_insert(ChatRecord)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[ChatRecord.id])
+        )
         await db.commit()
-        await db.refresh(new_chat)
-        return new_chat
 
     @staticmethod
-    async def get_document_by_hash(db: AsyncSession, file_hash: str):
-        """Helper to check if we've already paid to embed this file."""
+    def _chat_select(view: str):
+        """Rows for a chat list view; "summary" leaves out answers and sources."""
+        if view == "summary":
+            return select(
+                ChatRecord.id,
+                ChatRecord.session_id,
+                ChatRecord.document_id,
+                ChatRecord.question,
+                ChatRecord.created_at,
+            ), False
+        return select(ChatRecord).options(defer(ChatRecord.question_embedding)), True
+
+    @staticmethod
+    async def get_all_chats(
+        db: AsyncSession,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        view: str = "full",
+    ):
+        """
+        Retrieves the global chat history, newest first, one keyset page at
+        a time. Returns the page and the cursor of the next one.
+        """
+        stmt, scalars = RAGService._chat_select(view)
+        return await paginate(
+            db,
+            stmt,
+            ChatRecord.created_at,
+            ChatRecord.id,
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+            scalars=scalars,
+        )
+
+    @staticmethod
+    async def get_search_payload(db: AsyncSession, document_id: uuid.UUID):
+        """Only the columns needed to build a document's in-memory search index."""
         result = await db.execute(
-            select(DocumentRecord).where(DocumentRecord.file_hash == file_hash)
+            select(
+                DocumentRecord.chunks,
+                DocumentRecord.chunk_spans,
+                DocumentRecord.embeddings,
+                DocumentRecord.embedding_dim,
+                DocumentRecord.embedding_dtype,
+            ).where(DocumentRecord.id == document_id)
         )
-        return result.scalar_one_or_none()
+        return result.one()
 
     @staticmethod
-    async def get_document_history(db: AsyncSession, doc_id: uuid.UUID):
+    async def get_search_payloads(db: AsyncSession, document_ids: list[uuid.UUID]):
+        """get_search_payload for several documents in one round trip."""
         result = await db.execute(
-            select(ChatRecord)
-            # .where(ChatRecord.document_id == doc_id)
-            .order_by(ChatRecord.created_at.asc())
+            select(
+                DocumentRecord.id,
+                DocumentRecord.chunks,
+                DocumentRecord.chunk_spans,
+                DocumentRecord.embeddings,
+                DocumentRecord.embedding_dim,
+                DocumentRecord.embedding_dtype,
+            ).where(DocumentRecord.id.in_(document_ids))
         )
-        return result.scalars().all()
+        return result.all()
 
     @staticmethod
-    async def get_all_chats(db: AsyncSession, limit: int = 50):
+    async def get_ready_documents(
+        db: AsyncSession,
+        document_ids: Optional[list[uuid.UUID]] = None,
+    ):
+        """Ids, content hashes and chunk counts of searchable documents; all of them when document_ids is None."""
+        stmt = select(
+            DocumentRecord.id, DocumentRecord.content_hash, DocumentRecord.chunk_count
+        ).where(
+            DocumentRecord.status == DocumentStatus.READY.value
+        )
+        if document_ids is not None:
+            stmt = stmt.where(DocumentRecord.id.in_(document_ids))
+        result = await db.execute(stmt)
+        return result.all()
+
+    @staticmethod
+    async def search_chunks(
+        db: AsyncSession,
+        query_embedding: np.ndarray,
+        top_k: int = 3,
+        document_ids: Optional[list[uuid.UUID]] = None,
+    ):
         """
-        Retrieves the global chat history. 
-        Includes document titles via a JOIN to make the frontend useful.
+        Top-k cosine similarity search executed inside Postgres; only the
+        winning chunks are returned to the API process.
+
+        Corpus-wide queries walk the HNSW index. Document-scoped queries
+        read the documents' rows through the document_id index and rank
+        them exactly: an HNSW scan only yields ef_search candidates before
+        the filter applies, so a document that is a small part of the
+        corpus would get fewer than top_k chunks, or none.
         """
+        distance = DocumentChunk.embedding.cosine_distance(query_embedding)
+        # "+ 0" keeps the planner from matching ORDER BY to the HNSW index.
+        order = distance if document_ids is None else distance + 0
         stmt = (
-            select(ChatRecord)
-            # .options(joinedload(ChatRecord))  
-            .order_by(ChatRecord.created_at.desc())
-            .limit(limit)
+            select(
+                DocumentChunk.document_id,
+                DocumentChunk.ordinal,
+                DocumentChunk.page_number,
+                DocumentChunk.start_char,
+                DocumentChunk.end_char,
+                DocumentChunk.text,
+                (1 - distance).label("score"),
+            )
+            .order_by(order)
+            .limit(top_k)
         )
+        if document_ids is not None:
+            stmt = stmt.where(DocumentChunk.document_id.in_(document_ids))
+        else:
+            # HNSW returns at most ef_search rows, so it must cover top_k.
+            ef_search = max(int(settings.pgvector_ef_search), int(top_k))
+            await db.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
 
         result = await db.execute(stmt)
-        return result.scalars().unique().all()
+        return result.all()
 
     @staticmethod
-    async def get_existing_doc(db, file_hash):
-        stmt = select(DocumentRecord).where(
-            DocumentRecord.file_hash == file_hash)
+    async def search_chunks_lexical(
+        db: AsyncSession,
+        question: str,
+        top_k: int = 3,
+        document_ids: Optional[list[uuid.UUID]] = None,
+    ):
+        """
+        Full-text counterpart of search_chunks over the GIN-indexed
+        search_vector. The question is tokenized by the same parser as the
+        chunks and its terms are OR-ed, so any exact-term hit is a candidate.
+        """
+        config = cast("simple", REGCONFIG)
+        lexeme = func.unnest(
+            func.tsvector_to_array(func.to_tsvector(config, question))
+        ).column_valued("lexeme")
+        query = func.to_tsquery(
+            config,
+            select(func.string_agg(func.quote_literal(lexeme), " | ")).scalar_subquery(),
+        )
+        rank = func.ts_rank_cd(DocumentChunk.search_vector, query)
+        stmt = (
+            select(
+                DocumentChunk.document_id,
+                DocumentChunk.ordinal,
+                DocumentChunk.page_number,
+                DocumentChunk.start_char,
+                DocumentChunk.end_char,
+                DocumentChunk.text,
+                rank.label("score"),
+            )
+            .where(DocumentChunk.search_vector.op("@@")(query))
+            .order_by(rank.desc())
+            .limit(top_k)
+        )
+        if document_ids is not None:
+            stmt = stmt.where(DocumentChunk.document_id.in_(document_ids))
+
         result = await db.execute(stmt)
-        existing_doc = result.scalar_one_or_none()
-        return existing_doc
+        return result.all()
 
     @staticmethod
-    async def get_history(session_id,db):
-        record = await db.execute(select(ChatRecord).where(ChatRecord.session_id == session_id))
-        session =  record.scalars().all()
-
-        return session
\ No newline at end of file
+    async def get_history(
+        session_id,
+        db,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        view: str = "full",
+    ):
+        """A session's turns in chronological order, one keyset page at a time."""
+        stmt, scalars = RAGService._chat_select(view)
+        return await paginate(
+            db,
+            stmt.where(ChatRecord.session_id == session_id),
+            ChatRecord.created_at,
+            ChatRecord.id,
+            limit=limit,
+            cursor=cursor,
+            scalars=scalars,
+        )
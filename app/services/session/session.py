@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
 from fastapi import UploadFile, HTTPException
 import uuid
@@ -6,6 +6,15 @@ from app.services.document.document import DocumentService
 from sqlalchemy import select,delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.session import ChatSession
+from app.schemas.session import (
+    ChatRecordRead,
+    ChatRecordSummaryRead,
+    DocumentMinimalRead,
+    SessionSchema,
+)
+from app.services.pagination import paginate
+from app.services.rag import RAGService
+from app.services.ingestion.worker import ingestion_worker
 
 from sqlalchemy.orm import selectinload
 
@@ -15,6 +24,7 @@ class ChatSessionService:
     @staticmethod
     async def create_session(file: UploadFile, db: AsyncSession) -> ChatSession:
         new_file = await DocumentService.upload_file(file, db)
+        ingestion_worker.enqueue_unless_ready(new_file)
 
         new_session = ChatSession(
             id=uuid.uuid4(),
@@ -32,10 +42,7 @@ class ChatSessionService:
         query = (
             select(ChatSession)
             .where(ChatSession.id == session_id)
-            .options(
-                selectinload(ChatSession.document),
-                selectinload(ChatSession.messages)
-            )
+            .options(selectinload(ChatSession.document))
         )
         result = await db.execute(query)
         session = result.scalar_one_or_none()
@@ -45,9 +52,51 @@ class ChatSessionService:
         return session
 
     @staticmethod
-    async def get_sessions(db: AsyncSession) -> List[ChatSession]:
-        result = await db.execute(select(ChatSession))
-        return list(result.scalars().all())
+    async def get_session_content(
+        session_id: UUID,
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        view: str = "full",
+    ) -> Tuple[SessionSchema, Optional[str]]:
+        """The session with one page of its messages, oldest first."""
+        session = await ChatSessionService.get_session(session_id, db)
+        messages, next_cursor = await RAGService.get_history(
+            session_id, db, limit=limit, cursor=cursor, view=view
+        )
+        message_schema = ChatRecordSummaryRead if view == "summary" else ChatRecordRead
+        content = SessionSchema(
+            id=session.id,
+            document_id=session.document_id,
+            title=session.title,
+            created_at=session.created_at,
+            document=DocumentMinimalRead.model_validate(session.document),
+            messages=[message_schema.model_validate(message) for message in messages],
+        )
+        return content, next_cursor
+
+    @staticmethod
+    async def get_sessions(
+        db: AsyncSession,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List, Optional[str]]:
+        """Newest first, without summaries or messages."""
+        stmt = select(
+            ChatSession.id,
+            ChatSession.document_id,
+            ChatSession.title,
+            ChatSession.created_at,
+        )
+        return await paginate(
+            db,
+            stmt,
+            ChatSession.created_at,
+            ChatSession.id,
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+        )
     
     @staticmethod
     async def delete_session(db: AsyncSession, session_id: UUID) -> bool:
@@ -0,0 +1,357 @@
+"""
+End-to-end benchmarks: upload, extraction, chunking, embedding, top-k
+search and /chat streaming latency, written out as JSON.
+
+The LLM and the embedding model are the local stub backends unless
+LLM_BACKEND / EMBEDDING_BACKEND say otherwise, so runs are offline and
+repeatable. Upload, ingestion and /chat go through the real app, served
+in-process by uvicorn, against the Postgres configured by the DB_*
+settings (migrated with `alembic upgrade head`).
+
+    python -m benchmarks.run --pages 10,100 --concurrency 1,4,16 --output bench.json
+"""
+import os
+
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("EMBEDDING_BACKEND", "stub")
+
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+import uvicorn
+
+from app.core.config import settings
+from app.db.database import engine
+from app.main import app
+from app.services.chat.chunks import ChunkService
+from app.services.chat.lexical_index import BM25Index
+from app.services.chat.retrieval import RetrievalService
+from app.services.chat.vector_index import DocumentIndex, build_vector_index
+from app.services.document.document import DocumentService
+from app.services.llm.service import get_embedding_backend
+from benchmarks.synthetic import make_pdf
+
+QUESTIONS = [
+    "What was total revenue for AAPL?",
+    "How did operating expenses change?",
+    "What are the main risk factors?",
+    "What was diluted earnings per share?",
+    "How much long-term debt does the company have?",
+    "What is the outlook for capital expenditures?",
+]
+SETTINGS_REPORTED = (
+    "retrieval_backend", "vector_index_backend", "hybrid_retrieval",
+    "chunker_mode", "chunk_max_tokens", "chunk_overlap_tokens",
+    "embedding_storage_dtype", "embedding_dim", "context_token_budget",
+    "cache_backend", "answer_cache_enabled", "llm_backend", "embedding_backend",
+    "stub_first_token_latency_ms", "stub_token_latency_ms", "stub_answer_tokens",
+    "db_pool_size", "db_max_overflow", "db_pool_timeout",
+)
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    if not seconds:
+        return {"count": 0}
+    ms = np.asarray(seconds) * 1000
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def timed(fn: Callable, *args, repeat: int = 1) -> tuple:
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        durations.append(time.perf_counter() - start)
+    return result, durations
+
+
+async def bench_stages(pdf: Path, n_queries: int, top_k: int) -> Dict[str, Any]:
+    """In-process stage timings, without the database or HTTP."""
+    start = time.perf_counter()
+    content, page_offsets = await DocumentService.extract_content(str(pdf))
+    extraction = time.perf_counter() - start
+
+    chunks, chunking = timed(ChunkService.chunk_document, content, page_offsets)
+    texts = [chunk.text for chunk in chunks]
+
+    embedder = get_embedding_backend()
+    start = time.perf_counter()
+    embeddings = np.asarray(await embedder.embed(texts), dtype=np.float32)
+    embedding = time.perf_counter() - start
+
+    index, index_build = timed(build_vector_index, embeddings)
+    lexical, bm25_build = timed(BM25Index, texts)
+    document_index = DocumentIndex(
+        document_id=uuid.uuid4(),
+        chunks=texts,
+        chunk_spans=[[chunk.page, chunk.start, chunk.end] for chunk in chunks],
+        index=index,
+        lexical=lexical,
+    )
+
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(n_queries)]
+    query_vectors = np.asarray(await embedder.embed(questions), dtype=np.float32)
+    dense, lexical_search, hybrid = [], [], []
+    for question, vector in zip(questions, query_vectors):
+        dense += timed(index.search, vector, top_k)[1]
+        lexical_search += timed(lexical.search, question, top_k)[1]
+        hybrid += timed(
+            RetrievalService._search_indexes,
+            [document_index], question, vector, top_k, settings.hybrid_candidates, True,
+        )[1]
+
+    return {
+        "pages": len(page_offsets),
+        "characters": len(content),
+        "chunks": len(chunks),
+        "extraction": summarize([extraction]),
+        "chunking": summarize(chunking),
+        "embedding": summarize([embedding]),
+        "vector_index_build": summarize(index_build),
+        "bm25_build": summarize(bm25_build),
+        "search_dense": summarize(dense),
+        "search_bm25": summarize(lexical_search),
+        "search_hybrid": summarize(hybrid),
+    }
+
+
+async def bench_ingestion(client: httpx.AsyncClient, pdf: Path, timeout: float) -> Dict[str, Any]:
+    """Upload through POST /files, then poll until the ingestion worker is done."""
+    start = time.perf_counter()
+    with pdf.open("rb") as handle:
+        response = await client.post("/files", files={"file": (pdf.name, handle, "application/pdf")})
+    response.raise_for_status()
+    upload = time.perf_counter() - start
+    document_id = response.json()["id"]
+
+    status = response.json()["status"]
+    deadline = time.perf_counter() + timeout
+    while status not in ("ready", "failed") and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+        status = (await client.get(f"/files/{document_id}/status")).json()["status"]
+
+    return {
+        "document_id": document_id,
+        "status": status,
+        "upload": summarize([upload]),
+        "upload_to_ready": summarize([time.perf_counter() - start]),
+    }
+
+
+async def chat_once(
+    client: httpx.AsyncClient, document_id: str, session_id: str, question: str
+) -> Dict[str, Optional[float]]:
+    start = time.perf_counter()
+    first_token = None
+    async with client.stream(
+        "POST",
+        "/chat",
+        data={"file_id": document_id, "session_id": session_id, "question": question},
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return {"ttft": None, "total": None, "error": response.status_code}
+        async for chunk in response.aiter_bytes():
+            if chunk and first_token is None:
+                first_token = time.perf_counter() - start
+    return {"ttft": first_token, "total": time.perf_counter() - start, "error": None}
+
+
+async def bench_chat(
+    client: httpx.AsyncClient,
+    pdf: Path,
+    document_id: str,
+    concurrency: int,
+    requests_per_worker: int,
+) -> Dict[str, Any]:
+    """`concurrency` sessions, each asking `requests_per_worker` distinct questions back to back."""
+    sessions = []
+    for _ in range(concurrency):
+        with pdf.open("rb") as handle:
+            response = await client.post("/session", files={"file": (pdf.name, handle, "application/pdf")})
+        response.raise_for_status()
+        sessions.append(response.json()["id"])
+
+    async def worker(w: int, session_id: str) -> List[Dict[str, Optional[float]]]:
+        results = []
+        for i in range(requests_per_worker):
+            # Distinct wording per request, so no answer-cache replays.
+            question = f"{QUESTIONS[(w + i) % len(QUESTIONS)]} (request {w}-{i})"
+            results.append(await chat_once(client, document_id, session_id, question))
+        return results
+
+    start = time.perf_counter()
+    per_worker = await asyncio.gather(*(worker(w, s) for w, s in enumerate(sessions)))
+    wall = time.perf_counter() - start
+
+    results = [result for worker_results in per_worker for result in worker_results]
+    ok = [result for result in results if result["error"] is None]
+    return {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "throughput_rps": round(len(ok) / wall, 3) if wall else None,
+        "ttft": summarize([r["ttft"] for r in ok if r["ttft"] is not None]),
+        "total": summarize([r["total"] for r in ok]),
+    }
+
+
+async def bench_pool_pressure(
+    client: httpx.AsyncClient,
+    pdf: Path,
+    document_id: str,
+    streams: int,
+    requests_per_worker: int,
+) -> Dict[str, Any]:
+    """
+    More concurrent /chat streams than the DB pool has connections. Streams
+    hold no connection, so they should all complete without pool timeouts,
+    with the checked-out peak at or below the pool capacity.
+    """
+    pool = engine.sync_engine.pool
+    peak = 0
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, pool.checkedout())
+            await asyncio.sleep(0.005)
+
+    sampler = asyncio.create_task(sample())
+    try:
+        result = await bench_chat(client, pdf, document_id, streams, requests_per_worker)
+    finally:
+        done.set()
+        await sampler
+
+    return {
+        **result,
+        "pool_capacity": settings.db_pool_size + settings.db_max_overflow,
+        "peak_checked_out": peak,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    run_id = uuid.uuid4().hex[:12]
+    workdir = Path(tempfile.mkdtemp(prefix="rag-bench-"))
+    pdfs = {
+        pages: make_pdf(workdir / f"synthetic-{pages}p.pdf", pages, seed=args.seed, tag=f"{run_id}-{pages}")
+        for pages in args.pages
+    }
+
+    report: Dict[str, Any] = {
+        "run_id": run_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "settings": {name: getattr(settings, name) for name in SETTINGS_REPORTED},
+        "stages": {},
+        "ingestion": {},
+        "chat": {},
+        "pool_pressure": {},
+    }
+
+    for pages, pdf in pdfs.items():
+        report["stages"][str(pages)] = await bench_stages(pdf, args.queries, args.top_k)
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        if serve.done():
+            serve.result()
+        await asyncio.sleep(0.05)
+
+    try:
+        pool_streams = args.pool_streams or 2 * (settings.db_pool_size + settings.db_max_overflow)
+        limits = httpx.Limits(max_connections=max(args.concurrency + [pool_streams]) * 2)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=args.timeout, limits=limits
+        ) as client:
+            for pages, pdf in pdfs.items():
+                ingestion = await bench_ingestion(client, pdf, args.timeout)
+                report["ingestion"][str(pages)] = ingestion
+                if ingestion["status"] != "ready":
+                    continue
+                report["chat"][str(pages)] = [
+                    await bench_chat(
+                        client, pdf, ingestion["document_id"], concurrency, args.requests_per_worker
+                    )
+                    for concurrency in args.concurrency
+                ]
+                report["pool_pressure"][str(pages)] = await bench_pool_pressure(
+                    client, pdf, ingestion["document_id"], pool_streams, args.requests_per_worker
+                )
+    finally:
+        server.should_exit = True
+        await serve
+
+    return report
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=_int_list, default=[10, 100], help="page counts of the synthetic PDFs")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4, 16], help="concurrent /chat streams")
+    parser.add_argument("--requests-per-worker", type=int, default=4)
+    parser.add_argument(
+        "--pool-streams", type=int, default=0,
+        help="concurrent streams in the pool-pressure run (default: twice the DB pool capacity)",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="queries per in-process search benchmark")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", type=Path, help="JSON report path (default: stdout)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    result = asyncio.run(main(arguments))
+    output = json.dumps(result, indent=2, default=str)
+    if arguments.output:
+        arguments.output.write_text(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
@@ -0,0 +1,58 @@
+"""Deterministic synthetic financial filings as PDFs, for benchmarks."""
+import random
+from pathlib import Path
+
+import pymupdf
+
+TICKERS = ["AAPL", "MSFT", "BRK.B", "JPM", "XOM", "NVDA", "TSLA", "KO", "PFE", "WMT"]
+LINE_ITEMS = [
+    "Total revenue", "Cost of revenue", "Gross margin", "Operating expenses",
+    "Research and development", "Net income", "Diluted earnings per share",
+    "Free cash flow", "Long-term debt", "Share repurchases",
+]
+FILLER = (
+    "Management believes the results reflect continued demand across segments, "
+    "partially offset by currency headwinds and higher input costs. The company "
+    "expects capital expenditures to remain elevated as it expands capacity. "
+    "Risk factors include regulatory changes, supply chain disruption and "
+    "competitive pricing pressure in key markets."
+).split()
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 54
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(FILLER) for _ in range(words)).capitalize() + "."
+
+
+def page_text(rng: random.Random, page: int) -> str:
+    ticker = rng.choice(TICKERS)
+    lines = [f"{ticker} Quarterly Report - Section {page}", ""]
+    for _ in range(3):
+        lines.append(_paragraph(rng, rng.randint(60, 110)))
+        lines.append("")
+    for item in rng.sample(LINE_ITEMS, 4):
+        lines.append(f"{item}: ${rng.randint(100, 99_999):,}.{rng.randint(0, 9)} million")
+    return "\n".join(lines)
+
+
+def make_pdf(path: Path, pages: int, seed: int = 0, tag: str = "") -> Path:
+    """
+    Writes a text PDF of the given page count; the same seed gives the same
+    text. A distinct tag makes the file distinct, so uploads are not
+    deduplicated against earlier runs.
+    """
+    rng = random.Random(seed)
+    document = pymupdf.open()
+    rect = pymupdf.Rect(MARGIN, MARGIN, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN)
+    for page_number in range(1, pages + 1):
+        page = document.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        text = page_text(rng, page_number)
+        if page_number == 1 and tag:
+            text = f"Benchmark run {tag}\n\n{text}"
+        page.insert_textbox(rect, text, fontsize=9)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document.save(path)
+    document.close()
+    return path
@@ -0,0 +1,12 @@
+import os
+
+# Settings require database coordinates at import time; unit tests never
+# open a connection.
+for name, value in {
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+}.items():
+    os.environ.setdefault(name, value)
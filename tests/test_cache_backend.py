@@ -0,0 +1,69 @@
+import asyncio
+
+import fakeredis
+import numpy as np
+import pytest
+
+from app.services.cache import codec
+from app.services.cache.backend import RedisCacheBackend
+
+
+@pytest.fixture
+def backend():
+    backend = RedisCacheBackend("redis://localhost:6379/0", prefix="test:")
+    backend._redis = fakeredis.FakeAsyncRedis()
+    return backend
+
+
+def test_codec_round_trips_nested_arrays():
+    value = {
+        "embeddings": np.arange(12, dtype=np.float32).reshape(3, 4),
+        "ids": np.array([7, 8, 9], dtype=np.int64),
+        "empty": np.zeros((0, 4), dtype=np.float32),
+        "answers": ["a", "b", None],
+        "nested": [{"vector": np.array([1.5, -2.5], dtype=np.float64)}, 3],
+    }
+
+    loaded = codec.loads(codec.dumps(value))
+
+    for key in ("embeddings", "ids", "empty"):
+        assert loaded[key].dtype == value[key].dtype
+        np.testing.assert_array_equal(loaded[key], value[key])
+    assert loaded["answers"] == ["a", "b", None]
+    np.testing.assert_array_equal(loaded["nested"][0]["vector"], [1.5, -2.5])
+    assert loaded["nested"][1] == 3
+
+
+def test_codec_rejects_foreign_payloads():
+    with pytest.raises(ValueError):
+        codec.loads(b'{"value": 1}')
+
+
+def test_redis_backend_round_trips_numpy_objects(backend):
+    embeddings = np.random.default_rng(0).random((5, 8), dtype=np.float32)
+
+    async def main():
+        await backend.set_object(
+            "answer:doc:hash", {"embeddings": embeddings, "answers": ["x"] * 5}
+        )
+        return (
+            await backend.get_object("answer:doc:hash"),
+            await backend._redis.pttl("test:answer:doc:hash"),
+        )
+
+    loaded, ttl_ms = asyncio.run(main())
+
+    assert loaded["embeddings"].dtype == np.float32
+    np.testing.assert_array_equal(loaded["embeddings"], embeddings)
+    assert loaded["answers"] == ["x"] * 5
+    assert ttl_ms > 0
+
+
+def test_redis_backend_misses_and_deletes(backend):
+    async def main():
+        missing = await backend.get_object("qemb:absent")
+        await backend.set_object("qemb:key", np.ones(3, dtype=np.float32), ttl=60)
+        await backend.delete("qemb:key")
+        return missing, await backend.get_object("qemb:key")
+
+    assert asyncio.run(main()) == (None, None)
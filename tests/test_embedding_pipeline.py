@@ -0,0 +1,167 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import httpx
+import openai
+import pytest
+
+from app.services.llm import embedding_pipeline
+from app.services.llm.embedding_pipeline import EmbeddingPipeline
+
+REQUEST = httpx.Request("POST", "https://api.test/v1/embeddings")
+
+
+class FakeEmbeddings:
+    def __init__(self, latency: float = 0.0, failures: List[Exception] = ()) -> None:
+        self.latency = latency
+        self.failures = list(failures)
+        self.calls: List[List[str]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def create(self, model: str, input: List[str]):
+        self.calls.append(list(input))
+        if self.failures:
+            raise self.failures.pop(0)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text))])
+            for i, text in enumerate(input)
+        ]
+        # Out of order on purpose: the pipeline must sort by index.
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+class FakeClient:
+    def __init__(self, embeddings: FakeEmbeddings) -> None:
+        self.embeddings = embeddings
+
+    def with_options(self, **kwargs):
+        return self
+
+
+def test_concurrency_limit_is_shared_between_callers():
+    embeddings = FakeEmbeddings(latency=0.01)
+    pipeline = EmbeddingPipeline(
+        FakeClient(embeddings), "test-model", max_batch_size=1, concurrency=2
+    )
+
+    async def main():
+        return await asyncio.gather(
+            pipeline.embed([f"a{i}" for i in range(6)]),
+            pipeline.embed([f"b{i}" for i in range(6)]),
+        )
+
+    first, second = asyncio.run(main())
+
+    assert len(embeddings.calls) == 12
+    assert embeddings.peak_in_flight == 2
+    assert len(first) == len(second) == 6
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays: List[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(embedding_pipeline.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def rate_limit_error(retry_after: str = None) -> openai.RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(429, headers=headers, request=REQUEST)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_batches_respect_size_and_token_caps(monkeypatch):
+    monkeypatch.setattr(embedding_pipeline, "count_tokens", lambda text: len(text))
+    pipeline = EmbeddingPipeline(
+        FakeClient(FakeEmbeddings()), "test-model", max_batch_tokens=5, max_batch_size=3
+    )
+
+    batches = pipeline.make_batches(["a", "b", "c", "d", "eeee", "f", "gggggggg", "h"])
+
+    # "d" starts a batch on size, "f" and "h" on tokens; an oversized text
+    # still gets a batch of its own.
+    assert batches == [[0, 1, 2], [3, 4], [5], [6], [7]]
+
+
+def test_embed_returns_vectors_in_input_order():
+    embeddings = FakeEmbeddings()
+    pipeline = EmbeddingPipeline(
+        FakeClient(embeddings), "test-model", max_batch_size=2, concurrency=3
+    )
+    texts = ["x" * n for n in range(1, 8)]
+
+    vectors = asyncio.run(pipeline.embed(texts))
+
+    assert vectors == [[float(n)] for n in range(1, 8)]
+    assert [len(call) for call in embeddings.calls] == [2, 2, 2, 1]
+
+
+def test_embed_of_nothing_makes_no_requests():
+    embeddings = FakeEmbeddings()
+    pipeline = EmbeddingPipeline(FakeClient(embeddings), "test-model")
+
+    assert asyncio.run(pipeline.embed([])) == []
+    assert embeddings.calls == []
+
+
+def test_retryable_errors_back_off_and_retry(monkeypatch, sleeps):
+    monkeypatch.setattr(embedding_pipeline.settings, "embedding_backoff_base", 1.0)
+    monkeypatch.setattr(embedding_pipeline.settings, "embedding_backoff_max", 3.0)
+    embeddings = FakeEmbeddings(failures=[
+        rate_limit_error(),
+        openai.APIConnectionError(request=REQUEST),
+        rate_limit_error(),
+    ])
+    pipeline = EmbeddingPipeline(FakeClient(embeddings), "test-model", max_retries=3)
+
+    assert asyncio.run(pipeline.embed(["abc"])) == [[3.0]]
+    assert len(embeddings.calls) == 4
+    # Full jitter under an exponential ceiling capped at backoff_max.
+    assert len(sleeps) == 3
+    for delay, ceiling in zip(sleeps, [1.0, 2.0, 3.0]):
+        assert 0 <= delay <= ceiling
+
+
+def test_retry_after_header_sets_the_delay(sleeps):
+    embeddings = FakeEmbeddings(failures=[rate_limit_error(retry_after="1.5")])
+    pipeline = EmbeddingPipeline(FakeClient(embeddings), "test-model")
+
+    asyncio.run(pipeline.embed(["abc"]))
+
+    assert sleeps == [1.5]
+
+
+def test_gives_up_after_max_retries(sleeps):
+    embeddings = FakeEmbeddings(failures=[rate_limit_error() for _ in range(3)])
+    pipeline = EmbeddingPipeline(FakeClient(embeddings), "test-model", max_retries=2)
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(pipeline.embed(["abc"]))
+    assert len(embeddings.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_other_errors_are_not_retried(sleeps):
+    response = httpx.Response(400, request=REQUEST)
+    embeddings = FakeEmbeddings(failures=[
+        openai.BadRequestError("bad input", response=response, body=None),
+    ])
+    pipeline = EmbeddingPipeline(FakeClient(embeddings), "test-model")
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(pipeline.embed(["abc"]))
+    assert len(embeddings.calls) == 1
+    assert sleeps == []
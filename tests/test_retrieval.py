@@ -0,0 +1,78 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services.chat.retrieval import ChunkHit, RetrievalService
+from app.services.chat.vector_index import DocumentIndex, build_vector_index
+
+DOC_A = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+DOC_B = uuid.UUID("00000000-0000-0000-0000-00000000000b")
+
+
+def make_index(document_id, vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return DocumentIndex(
+        document_id=document_id,
+        chunks=[f"{document_id.hex[-1]}{i}" for i in range(len(vectors))],
+        chunk_spans=[[i + 1, 10 * i, 10 * i + 9] for i in range(len(vectors))],
+        index=build_vector_index(vectors, backend="exact"),
+    )
+
+
+def hit(document_id, ordinal, score=0.0):
+    return ChunkHit(
+        document_id=document_id, ordinal=ordinal, page_number=None, text="", score=score
+    )
+
+
+def dense_search(query):
+    return lambda document_index, k: document_index.index.search(np.asarray(query), k)
+
+
+def test_merge_top_k_keeps_the_best_chunks_across_documents():
+    index_a = make_index(DOC_A, [[1, 0], [0, 1], [0.8, 0.6]])
+    index_b = make_index(DOC_B, [[0.6, 0.8], [0.96, 0.28], [-1, 0]])
+
+    hits = RetrievalService.merge_top_k([index_a, index_b], dense_search([1, 0]), 3)
+
+    assert [(h.document_id, h.ordinal) for h in hits] == [
+        (DOC_A, 0), (DOC_B, 1), (DOC_A, 2),
+    ]
+    assert [h.score for h in hits] == pytest.approx([1.0, 0.96, 0.8])
+    # Text and provenance come from the owning document.
+    assert hits[1].text == "b1"
+    assert (hits[1].page_number, hits[1].start_char, hits[1].end_char) == (2, 10, 19)
+
+
+def test_merge_top_k_with_fewer_chunks_than_k():
+    index_a = make_index(DOC_A, [[0, 1]])
+    index_b = make_index(DOC_B, [[1, 0]])
+
+    hits = RetrievalService.merge_top_k([index_a, index_b], dense_search([1, 0]), 5)
+
+    assert [(h.document_id, h.ordinal) for h in hits] == [(DOC_B, 0), (DOC_A, 0)]
+
+
+def test_fuse_ranks_by_reciprocal_rank(monkeypatch):
+    monkeypatch.setattr("app.services.chat.retrieval.settings.rrf_k", 60)
+    dense = [hit(DOC_A, 0, 0.9), hit(DOC_A, 1, 0.8), hit(DOC_A, 2, 0.7)]
+    lexical = [hit(DOC_A, 2, 12.0), hit(DOC_A, 0, 11.0), hit(DOC_B, 0, 10.0)]
+
+    fused = RetrievalService.fuse([dense, lexical], top_k=3)
+
+    assert [(h.document_id, h.ordinal) for h in fused] == [
+        (DOC_A, 0), (DOC_A, 2), (DOC_A, 1),
+    ]
+    assert [h.score for h in fused] == pytest.approx(
+        [1 / 61 + 1 / 62, 1 / 63 + 1 / 61, 1 / 62]
+    )
+
+
+def test_fuse_keeps_same_ordinal_of_different_documents_apart(monkeypatch):
+    monkeypatch.setattr("app.services.chat.retrieval.settings.rrf_k", 60)
+
+    fused = RetrievalService.fuse([[hit(DOC_A, 0)], [hit(DOC_B, 0)]], top_k=5)
+
+    assert {h.document_id for h in fused} == {DOC_A, DOC_B}
+    assert [h.score for h in fused] == pytest.approx([1 / 61, 1 / 61])